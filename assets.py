@@ -0,0 +1,125 @@
+# assets.py
+import os
+import threading
+from collections import OrderedDict
+import pygame
+from constants import *
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def resource_path(*parts):
+    # Resolve game files relative to the package, not the working directory
+    return os.path.join(BASE_DIR, *parts)
+
+class AssetManager:
+    # Loads each image once, scales it, converts it to the display format and
+    # keeps it in an LRU cache keyed by (name, index, size). With an atlas
+    # (atlas.py), images are subsurfaces of one converted sheet per theme.
+    def __init__(self, max_images=ASSET_CACHE_SIZE):
+        self.max_images = max_images
+        self.cache = OrderedDict()
+        # Scaled but unconverted images loaded by background preloads
+        self.preloaded = {}
+        self.lock = threading.Lock()
+        self.atlas = None
+        self.sheets = {}
+
+    def use_atlas(self, atlas):
+        with self.lock:
+            self.atlas = atlas
+            self.sheets.clear()
+
+    def tile_path(self, theme, index):
+        if theme:
+            return resource_path("level_resources", theme, f"tile_image{index}.png")
+        return resource_path("level_resources", f"tile_image{index}.png")
+
+    def player_path(self, direction):
+        return resource_path("player_resources", f"player-{direction}.png")
+
+    def tile_image(self, theme, index, size=TILE_SIZE):
+        sprite = self.atlas.find_tile(theme, index) if self.atlas else None
+        return self.image((theme, index, (size, size)), self.tile_path(theme, index), (size, size), sprite)
+
+    def tile_images(self, theme, count=NUM_TILE_IMAGES, size=TILE_SIZE):
+        return [self.tile_image(theme, i, size) for i in range(count)]
+
+    def player_image(self, direction, size):
+        # size is a (width, height) pair
+        sprite = self.atlas.find_player(direction) if self.atlas else None
+        return self.image(("player", direction, size), self.player_path(direction), size, sprite)
+
+    def image(self, key, path, size, sprite=None):
+        # sprite is the image's (group, rect) in the atlas, if it has one
+        with self.lock:
+            surface = self.cache.get(key)
+            if surface is not None:
+                self.cache.move_to_end(key)
+                return surface
+            surface = self.preloaded.pop(key, None)
+        if sprite is not None:
+            group, rect = sprite
+            surface = self.sheet(group).subsurface(rect)
+            if surface.get_size() != size:
+                surface = pygame.transform.scale(surface, size)
+        else:
+            if surface is None:
+                surface = self.load_scaled(path, size)
+            # Conversion needs the display, so it always happens on the main thread
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()
+        with self.lock:
+            self.cache[key] = surface
+            while len(self.cache) > self.max_images:
+                self.cache.popitem(last=False)
+        return surface
+
+    def sheet(self, group):
+        # An atlas sheet, converted once
+        with self.lock:
+            sheet = self.sheets.get(group)
+            if sheet is not None:
+                return sheet
+            sheet = self.preloaded.pop(("sheet", group), None)
+        if sheet is None:
+            sheet = self.atlas.load_sheet(group)
+        if pygame.display.get_surface() is not None:
+            sheet = sheet.convert_alpha()
+        with self.lock:
+            self.sheets[group] = sheet
+        return sheet
+
+    def load_scaled(self, path, size):
+        try:
+            image = pygame.image.load(path)
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Could not load {path}: {e}")
+            image = pygame.Surface((1, 1))
+            image.fill((255, 0, 255))  # Magenta marks a missing image
+        return pygame.transform.scale(image, size)
+
+    def preload(self, theme, count, size):
+        atlas = self.atlas
+        if atlas is not None:
+            group = atlas.tile_group(theme)
+            key = ("sheet", group)
+            with self.lock:
+                loaded = group in self.sheets or key in self.preloaded
+            if not loaded and group in atlas.atlases:
+                sheet = atlas.load_sheet(group)
+                with self.lock:
+                    if group not in self.sheets:
+                        self.preloaded[key] = sheet
+        for i in range(count):
+            if atlas is not None and atlas.find_tile(theme, i):
+                continue
+            key = (theme, i, (size, size))
+            with self.lock:
+                if key in self.cache or key in self.preloaded:
+                    continue
+            surface = self.load_scaled(self.tile_path(theme, i), (size, size))
+            with self.lock:
+                if key not in self.cache:
+                    self.preloaded[key] = surface
+
+asset_manager = AssetManager()
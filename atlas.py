@@ -0,0 +1,173 @@
+# atlas.py
+# Packs the loose images under level_resources/ and player_resources/ into
+# one texture atlas per theme (plus one for the shared tiles and one for the
+# player), with a JSON index of where each sprite is. The asset manager
+# loads one atlas image per theme and hands out subsurfaces of it.
+#
+#   python atlas.py build       rebuild atlas_resources/
+#   python atlas.py list        show the sprites in each atlas
+#
+# Sprites are stored at the size the game draws them, so at runtime they
+# are neither decoded nor scaled one by one. Images that can't be decoded
+# are left out and keep loading (or failing) from their own files.
+import argparse
+import glob
+import json
+import os
+import pygame
+from constants import *
+from assets import resource_path
+
+ATLAS_DIR = resource_path("atlas_resources")
+INDEX_PATH = os.path.join(ATLAS_DIR, "atlas.json")
+INDEX_VERSION = 1
+MAX_SHEET_WIDTH = 2048
+COMMON = "common"  # Atlas of the images shared by every theme
+PLAYER = "player"
+
+def source_groups():
+    # {atlas name: (source dir, size sprites are stored at)}
+    groups = {COMMON: (resource_path("level_resources"), TILE_SIZE),
+              PLAYER: (resource_path("player_resources"), PLAYER_SIZE)}
+    for theme in THEMES:
+        groups[theme] = (resource_path("level_resources", theme), TILE_SIZE)
+    return groups
+
+def source_files(directory):
+    return sorted(glob.glob(os.path.join(directory, "*.png")))
+
+def sprite_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+def sheet_file(group):
+    return group.lower().replace(" ", "_") + ".png"
+
+def pack_shelves(sizes, max_width=MAX_SHEET_WIDTH):
+    # Shelf packing, tallest first: returns each size's (x, y) in input
+    # order and the sheet size
+    order = sorted(range(len(sizes)), key=lambda i: -sizes[i][1])
+    positions = [None] * len(sizes)
+    x = y = shelf_height = width = 0
+    for i in order:
+        w, h = sizes[i]
+        if x + w > max_width and x > 0:
+            y += shelf_height
+            x = shelf_height = 0
+        positions[i] = (x, y)
+        x += w
+        width = max(width, x)
+        shelf_height = max(shelf_height, h)
+    return positions, (width, y + shelf_height)
+
+def build_group(group, directory, size, out_dir):
+    sprites = []
+    for path in source_files(directory):
+        try:
+            image = pygame.image.load(path)
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Skipping {path}: {e}")
+            continue
+        sprites.append((sprite_name(path), pygame.transform.scale(image, (size, size))))
+    if not sprites:
+        return None
+    positions, sheet_size = pack_shelves([surface.get_size() for _, surface in sprites])
+    sheet = pygame.Surface(sheet_size, pygame.SRCALPHA)
+    rects = {}
+    for (name, surface), (x, y) in zip(sprites, positions):
+        sheet.blit(surface, (x, y))
+        rects[name] = [x, y, surface.get_width(), surface.get_height()]
+    pygame.image.save(sheet, os.path.join(out_dir, sheet_file(group)))
+    return {"image": sheet_file(group), "sprites": rects}
+
+def build_atlases(out_dir=ATLAS_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+    atlases = {}
+    for group, (directory, size) in source_groups().items():
+        atlas = build_group(group, directory, size, out_dir)
+        if atlas is not None:
+            atlases[group] = atlas
+    index = {"version": INDEX_VERSION, "sources": source_list(), "atlases": atlases}
+    index_path = os.path.join(out_dir, "atlas.json")
+    temp_path = index_path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    os.replace(temp_path, index_path)
+    return index
+
+def source_list():
+    return sorted(os.path.relpath(path, resource_path()) for directory, _ in source_groups().values()
+                  for path in source_files(directory))
+
+def atlases_are_stale(index_path=INDEX_PATH):
+    # Stale when an image was added, removed or changed since the build
+    if not os.path.exists(index_path):
+        return True
+    with open(index_path) as f:
+        index = json.load(f)
+    if index.get("version") != INDEX_VERSION or index.get("sources") != source_list():
+        return True
+    built = os.path.getmtime(index_path)
+    return any(os.path.getmtime(resource_path(path)) > built for path in index["sources"])
+
+class Atlas:
+    # The atlas index plus the sheet images, loaded when first asked for.
+    # Sheets come back unconverted; the asset manager converts them once on
+    # the main thread.
+    def __init__(self, index_path=INDEX_PATH):
+        self.directory = os.path.dirname(index_path)
+        with open(index_path) as f:
+            index = json.load(f)
+        if index.get("version") != INDEX_VERSION:
+            raise ValueError(f"{index_path} is not a version {INDEX_VERSION} atlas index")
+        self.atlases = index["atlases"]
+
+    def find(self, group, name):
+        # (group, pygame.Rect of the sprite in the group's sheet), or None
+        atlas = self.atlases.get(group)
+        if atlas is None or name not in atlas["sprites"]:
+            return None
+        return group, pygame.Rect(atlas["sprites"][name])
+
+    def tile_group(self, theme):
+        return theme or COMMON
+
+    def find_tile(self, theme, index):
+        return self.find(self.tile_group(theme), f"tile_image{index}")
+
+    def find_player(self, direction):
+        return self.find(PLAYER, f"player-{direction}")
+
+    def load_sheet(self, group):
+        return pygame.image.load(os.path.join(self.directory, self.atlases[group]["image"]))
+
+def load_atlas():
+    # The atlas, rebuilt first if any source image changed. None when it
+    # can't be built or read, in which case images load from their files.
+    try:
+        if atlases_are_stale():
+            print("Building texture atlases...")
+            build_atlases()
+        return Atlas()
+    except (OSError, ValueError, KeyError, pygame.error) as e:
+        print(f"Texture atlases unavailable: {e}")
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and inspect texture atlases")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="pack the loose images into atlases")
+    build_parser.add_argument("--output", default=ATLAS_DIR)
+    commands.add_parser("list", help="show the sprites in each atlas")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        index = build_atlases(args.output)
+        for group, atlas in index["atlases"].items():
+            print(f"{group}: {len(atlas['sprites'])} sprites in {atlas['image']}")
+        return
+
+    for group, atlas in Atlas().atlases.items():
+        print(f"{group} ({atlas['image']}): {', '.join(sorted(atlas['sprites']))}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# audio.py
+# Sound effects and per-theme music. Nothing here runs on the game thread
+# except dictionary lookups and Sound.play(): the mixer is opened, effects
+# are decoded and music is started on a worker thread, so a trigger never
+# stalls a frame.
+#
+# Files are looked up by name under sound_resources/ in any format the mixer
+# reads, e.g. sound_resources/effects/artifact.ogg and
+# sound_resources/music/ancient_egypt.ogg. Missing files and a missing or
+# broken audio device just mean silence.
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+from constants import *
+from assets import resource_path
+
+EFFECTS = ["artifact", "lore", "hit", "door", "boss_defeated"]
+SOUND_EXTENSIONS = (".ogg", ".wav", ".mp3", ".flac")
+
+def sound_file(kind, name):
+    # The first file named name under sound_resources/kind, or None
+    for extension in SOUND_EXTENSIONS:
+        path = resource_path("sound_resources", kind, name + extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+def music_name(theme):
+    return theme.lower().replace(" ", "_")
+
+class AudioManager:
+    # Decoded effects are kept in an LRU cache of at most max_bytes of
+    # samples. Effects that aren't cached yet are decoded in the background
+    # and play once they are ready.
+    def __init__(self, max_bytes=AUDIO_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.enabled = False
+        self.available = None  # Whether the mixer opened, once it was tried
+        self.sounds = OrderedDict()  # name: (Sound, bytes)
+        self.cached_bytes = 0
+        self.loading = set()
+        self.missing = set()
+        self.music = None
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def enable(self):
+        self.enabled = True
+
+    def submit(self, function, *args):
+        if not self.enabled:
+            return
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio")
+        self.executor.submit(function, *args)
+
+    def open_mixer(self):
+        # Worker thread only
+        if self.available is None:
+            try:
+                pygame.mixer.init()
+                self.available = pygame.mixer.get_init() is not None
+            except pygame.error as e:
+                print(f"Audio unavailable: {e}")
+                self.available = False
+        return self.available
+
+    def preload(self, names):
+        for name in names:
+            self.request(name, False)
+
+    def play(self, name):
+        # Never blocks: plays the cached effect, or has it decoded and
+        # played as soon as it is ready
+        if not self.enabled or self.available is False:
+            return
+        with self.lock:
+            entry = self.sounds.get(name)
+            if entry is not None:
+                self.sounds.move_to_end(name)
+        if entry is not None:
+            entry[0].play()
+        else:
+            self.request(name, True)
+
+    def request(self, name, play):
+        if self.available is False:
+            return
+        with self.lock:
+            if name in self.missing or name in self.sounds or (name in self.loading and not play):
+                return
+            self.loading.add(name)
+        self.submit(self.load, name, play)
+
+    def load(self, name, play):
+        # Worker thread: decode one effect into the cache
+        sound = None
+        try:
+            with self.lock:
+                entry = self.sounds.get(name)
+            if entry is not None:
+                sound = entry[0]
+            elif self.open_mixer():
+                path = sound_file("effects", name)
+                if path is None:
+                    with self.lock:
+                        self.missing.add(name)
+                    return
+                sound = pygame.mixer.Sound(path)
+                self.store(name, sound)
+            if sound is not None and play:
+                sound.play()
+        except (pygame.error, OSError) as e:
+            print(f"Can't load sound {name}: {e}")
+            with self.lock:
+                self.missing.add(name)
+        finally:
+            with self.lock:
+                self.loading.discard(name)
+
+    def store(self, name, sound):
+        frequency, size, channels = pygame.mixer.get_init()
+        nbytes = int(sound.get_length() * frequency) * channels * (abs(size) // 8)
+        with self.lock:
+            # An effect bigger than the whole budget plays without being kept
+            if nbytes > self.max_bytes:
+                return
+            self.sounds[name] = (sound, nbytes)
+            self.cached_bytes += nbytes
+            while self.cached_bytes > self.max_bytes:
+                _, (_, evicted) = self.sounds.popitem(last=False)
+                self.cached_bytes -= evicted
+
+    def play_music(self, theme):
+        # Streams the theme's music from disk, looping, unless it is
+        # already playing
+        if self.enabled and theme != self.music:
+            self.music = theme
+            self.submit(self.start_music, theme)
+
+    def start_music(self, theme):
+        # Worker thread
+        if not self.open_mixer() or theme != self.music:
+            return
+        path = sound_file("music", music_name(theme))
+        try:
+            if path is None:
+                pygame.mixer.music.stop()
+                return
+            pygame.mixer.music.load(path)
+            pygame.mixer.music.set_volume(MUSIC_VOLUME)
+            pygame.mixer.music.play(-1)
+        except pygame.error as e:
+            print(f"Can't play music {path}: {e}")
+
+    def stop_music(self):
+        if self.music is not None:
+            self.music = None
+            self.submit(self.end_music)
+
+    def end_music(self):
+        # Worker thread
+        if self.available and self.music is None:
+            pygame.mixer.music.stop()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+        if self.available:
+            pygame.mixer.quit()
+            self.available = None
+        with self.lock:
+            self.sounds.clear()
+            self.cached_bytes = 0
+        self.music = None
+
+audio = AudioManager()
@@ -0,0 +1,48 @@
+# benchmarks/render_compare.py
+# Compares per-frame draw cost of the dirty-rect renderer against full redraws
+# on the same seeded play-through. Runs headless on SDL's dummy driver.
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from constants import FRAME_TIME
+from game import Game
+from simulation import random_policy
+
+def measure(game, dirty_rects, frames, seed):
+    random.seed(seed)
+    game.reset_game_state()
+    game.state = "GAME"
+    game.dirty_rects = dirty_rects
+    game.renderer.invalidate()
+    policy = random_policy(random.Random(seed))
+    draw_time = 0.0
+    for _ in range(frames):
+        if game.state != "GAME":
+            game.reset_game_state()
+            game.state = "GAME"
+        game.step(policy(game), FRAME_TIME)
+        start = time.perf_counter()
+        game.draw()
+        draw_time += time.perf_counter() - start
+    return draw_time / frames * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dirty-rect and full-screen rendering")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    game = Game(headless=True)
+    full = measure(game, False, args.frames, args.seed)
+    dirty = measure(game, True, args.frames, args.seed)
+    print(f"Full redraw: {full:.3f} ms/frame")
+    print(f"Dirty rects: {dirty:.3f} ms/frame")
+    print(f"Speedup:     {full / dirty:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+# benchmarks/run.py
+# Deterministic benchmarks for the simulation and rendering hot paths.
+# Runs headless on SDL's dummy driver:
+#
+#   python benchmarks/run.py            run and compare against baseline.json
+#   python benchmarks/run.py --save     run and store the results as the baseline
+#   python benchmarks/run.py -k draw    run only benchmarks whose name contains "draw"
+#
+# Exits non-zero when a benchmark is slower than the baseline by more than
+# the threshold. Baselines are machine specific; re-save them when the
+# hardware changes.
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from constants import *
+from game import Game
+from enemy import EnemySwarm
+from boss import ProjectilePool
+from grid import TileGrid
+from inputs import Inputs
+from simulation import random_policy
+from snapshot import take_snapshot, restore_snapshot
+
+SEED = 1234
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+game = None
+
+def get_game():
+    # One shared headless game; every benchmark re-seeds and resets it
+    global game
+    if game is None:
+        game = Game(headless=True)
+    random.seed(SEED)
+    game.num_enemies = 3
+    game.reset_game_state()
+    game.state = "GAME"
+    return game
+
+def bench_initialize_level():
+    game = get_game()
+    def run():
+        game.initialize_level()
+    return run, 1
+
+def bench_create_large_grid():
+    # A level 50 screens wide
+    game = get_game()
+    cols = LEVEL_WIDTH // TILE_SIZE * 50
+    rows = HEIGHT // TILE_SIZE
+    def run():
+        types = bytes(random.randrange(NUM_TILE_IMAGES) for _ in range(cols * rows))
+        grid = TileGrid(cols, rows, types, game.tile_images)
+        grid.random_cells(3, VISIBLE_COLUMNS)
+    return run, 1
+
+def bench_tile_hit_testing():
+    rng = random.Random(SEED)
+    cols = 800
+    grid = TileGrid(cols, 6, bytes(cols * 6), [None] * NUM_TILE_IMAGES)
+    points = [(rng.randrange(cols * TILE_SIZE), rng.randrange(HEIGHT)) for _ in range(1000)]
+    rects = [pygame.Rect(x, y, PLAYER_SIZE, PLAYER_SIZE) for x, y in points]
+    def run():
+        for point in points:
+            grid.tile_at(point)
+        for rect in rects:
+            grid.tiles_in_rect(rect)
+    return run, len(points) + len(rects)
+
+def bench_enemy_step():
+    # Full simulation steps with a crowd of enemies
+    game = get_game()
+    game.num_enemies = 200
+    game.enemies.populate(game.num_enemies)
+    game.player.health = 10 ** 9
+    inputs = Inputs(right=True)
+    def run():
+        game.time_remaining = LEVEL_TIME_LIMIT
+        for _ in range(60):
+            game.step(inputs, FRAME_TIME)
+    return run, 60
+
+def bench_swarm_1000():
+    # Bulk movement and overlap tests on a large swarm
+    rng = random.Random(SEED)
+    swarm = EnemySwarm()
+    for _ in range(1000):
+        swarm.spawn(rng.randrange(LEVEL_WIDTH - ENEMY_SIZE), rng.randrange(HEIGHT - ENEMY_SIZE),
+                    ENEMY_SIZE, ENEMY_SIZE, rng.randint(1, 3))
+    player = pygame.Rect(0, 0, PLAYER_SIZE, PLAYER_SIZE)
+    view = pygame.Rect(0, 0, WIDTH, HEIGHT)
+    def run():
+        for _ in range(60):
+            swarm.move(FRAME_TIME)
+            swarm.overlapping(player)
+        swarm.overlapping(view)
+    return run, 60
+
+def bench_enemy_chase_1000():
+    # A large swarm sharing one flow field toward a player who keeps
+    # changing cells, so the field is rebuilt as well as followed
+    game = get_game()
+    game.enemies.populate(1000, random.Random(SEED))
+    moves = [Inputs(right=True)] * 30 + [Inputs(left=True)] * 30
+    def run():
+        for inputs in moves:
+            game.player.move(inputs)
+            game.move_enemies(FRAME_TIME)
+    return run, len(moves)
+
+def bench_projectiles_3000():
+    # Moving, colliding and drawing a screen full of boss projectiles. They
+    # drift slowly so the pool stays full for the whole run.
+    game = get_game()
+    rng = random.Random(SEED)
+    pool = ProjectilePool()
+    bounds = pygame.Rect(0, 0, LEVEL_WIDTH, HEIGHT)
+    player = pygame.Rect(-PLAYER_SIZE * 2, 0, PLAYER_SIZE, PLAYER_SIZE)
+    for _ in range(3000):
+        pool.spawn(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT), rng.uniform(-0.01, 0.01), rng.uniform(-0.01, 0.01))
+    def run():
+        for _ in range(60):
+            pool.move(FRAME_TIME)
+            pool.collide(player, bounds)
+            pool.draw(game.screen, 0, game.camera.view)
+    return run, 60
+
+def bench_simulated_session():
+    game = get_game()
+    policy = random_policy(random.Random(SEED))
+    def run():
+        random.seed(SEED)
+        game.reset_game_state()
+        game.state = "GAME"
+        for _ in range(600):
+            if game.state != "GAME":
+                break
+            game.step(policy(game), FRAME_TIME)
+    return run, 600
+
+def bench_snapshot_save():
+    game = get_game()
+    for _ in range(300):
+        game.step(Inputs(right=True, interact=True), FRAME_TIME)
+    def run():
+        take_snapshot(game)
+    return run, 1
+
+def bench_snapshot_restore():
+    game = get_game()
+    snapshot = take_snapshot(game)
+    def run():
+        restore_snapshot(game, snapshot)
+    return run, 1
+
+def bench_history_rewind():
+    # Rewinding the full history with a crowd of enemies
+    game = get_game()
+    game.enemies.populate(500)
+    game.player.health = 10 ** 9
+    inputs = Inputs(right=True)
+    for _ in range(REWIND_FRAMES):
+        game.step(inputs, FRAME_TIME)
+    history = game.history
+    def run():
+        for _ in range(REWIND_FRAMES):
+            history.record(game, 1.0)
+        history.rewind(game, REWIND_FRAMES)
+    return run, REWIND_FRAMES
+
+def draw_benchmark(dirty_rects):
+    def setup():
+        game = get_game()
+        game.dirty_rects = dirty_rects
+        policy = random_policy(random.Random(SEED))
+        game.draw()
+        def run():
+            for _ in range(60):
+                game.time_remaining = LEVEL_TIME_LIMIT
+                game.step(policy(game), FRAME_TIME)
+                game.draw()
+        return run, 60
+    return setup
+
+def bench_ui_draw():
+    game = get_game()
+    def run():
+        for _ in range(60):
+            game.time_remaining -= FRAME_TIME
+            game.draw_ui()
+    return run, 60
+
+BENCHMARKS = [
+    ("initialize_level", bench_initialize_level),
+    ("create_large_grid", bench_create_large_grid),
+    ("tile_hit_testing", bench_tile_hit_testing),
+    ("enemy_step_200", bench_enemy_step),
+    ("swarm_1000", bench_swarm_1000),
+    ("enemy_chase_1000", bench_enemy_chase_1000),
+    ("projectiles_3000", bench_projectiles_3000),
+    ("simulated_session", bench_simulated_session),
+    ("snapshot_save", bench_snapshot_save),
+    ("snapshot_restore", bench_snapshot_restore),
+    ("history_rewind_500", bench_history_rewind),
+    ("draw_full", draw_benchmark(False)),
+    ("draw_dirty", draw_benchmark(True)),
+    ("ui_draw", bench_ui_draw),
+]
+
+def measure(setup, repeat, min_time):
+    run, ops = setup()
+    run()  # Warm up caches
+    best = None
+    for _ in range(repeat):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            run()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        rate = calls * ops / elapsed
+        best = rate if best is None else max(best, rate)
+
+    # Allocations of one more call, measured separately so tracing
+    # doesn't slow down the timed runs
+    run, ops = setup()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    run()
+    after = tracemalloc.take_snapshot()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    return {"ops_per_sec": best, "alloc_blocks_per_op": blocks / ops, "peak_kb": peak / 1024}
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument("-k", dest="pattern", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timed repeat")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown against the baseline")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    print(f"{'benchmark':<20}{'ops/s':>12}{'baseline':>12}{'change':>9}{'blocks/op':>11}{'peak KB':>10}")
+    for name, setup in BENCHMARKS:
+        if args.pattern not in name:
+            continue
+        result = measure(setup, args.repeat, args.min_time)
+        results[name] = result
+        base = baseline.get(name, {}).get("ops_per_sec")
+        change = ""
+        if base:
+            ratio = result["ops_per_sec"] / base - 1
+            change = f"{ratio:+.0%}"
+            if ratio < -args.threshold:
+                regressions.append(name)
+        print(f"{name:<20}{result['ops_per_sec']:>12.1f}{base or 0:>12.1f}{change:>9}"
+              f"{result['alloc_blocks_per_op']:>11.1f}{result['peak_kb']:>10.1f}")
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Saved baseline to {args.baseline}")
+    elif regressions:
+        print(f"Slower than baseline by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
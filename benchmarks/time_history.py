@@ -0,0 +1,108 @@
+# benchmarks/time_history.py
+# Checks the Rewind history against its budgets with a large swarm: under
+# MAX_BYTES of memory for a full REWIND_SECONDS of frames, under
+# MAX_RECORD_MS of recording per simulated frame, and under MAX_REWIND_MS
+# for the slowest rewind, which lands furthest from a keyframe.
+#
+#   python benchmarks/time_history.py
+#   python benchmarks/time_history.py --enemies 1000
+#
+# Exits non-zero when a budget is exceeded.
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from constants import *
+from game import Game
+from history import TimeHistory
+from inputs import Inputs
+
+SEED = 1234
+MAX_BYTES = 1024 * 1024
+MAX_RECORD_MS = 0.1
+MAX_REWIND_MS = FRAME_TIME * 1000 / 2
+
+def fill(game, history, frames):
+    # Steps the world like Game.step() does and records every frame, with
+    # the time scale cycling through the time powers. Returns the seconds
+    # spent recording.
+    inputs = [Inputs(right=True), Inputs(down=True), Inputs(left=True), Inputs(up=True)]
+    scales = (1.0, SLOW_TIME_SCALE, 0.0)
+    recording = 0.0
+    for frame in range(frames):
+        scale = scales[frame // 50 % 3]
+        game.player.move(inputs[frame // 20 % 4])
+        world_dt = FRAME_TIME * scale
+        if world_dt > 0:
+            game.move_enemies(world_dt)
+        game.time_remaining -= world_dt
+        start = time.perf_counter()
+        history.record(game, scale)
+        recording += time.perf_counter() - start
+    return recording
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the rewind history's memory and time budgets")
+    parser.add_argument("--enemies", type=int, default=500)
+    parser.add_argument("--frames", type=int, default=REWIND_FRAMES * 10, help="frames to record")
+    args = parser.parse_args()
+
+    random.seed(SEED)
+    game = Game(headless=True)
+    game.reset_game_state()
+    game.state = "GAME"
+    game.enemies.clear()
+    game.enemies.populate(args.enemies, random.Random(SEED))
+
+    history = TimeHistory()
+    recording = fill(game, history, args.frames)
+    record_ms = recording / args.frames * 1000
+
+    # Memory held once the history is full, as counted by the history and
+    # as allocated according to tracemalloc
+    history = TimeHistory()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    fill(game, history, REWIND_FRAMES * 2)
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    held = len(history)
+    size = history.nbytes()
+
+    # Rewinds starting at every offset into a block
+    rewind_ms = 0.0
+    for _ in range(history.keyframe_interval):
+        fill(game, history, REWIND_FRAMES + 1)
+        start = time.perf_counter()
+        rewound = history.rewind(game, REWIND_FRAMES)
+        rewind_ms = max(rewind_ms, (time.perf_counter() - start) * 1000)
+
+    print(f"{args.enemies} enemies, {held} frames held ({REWIND_SECONDS}s of rewind)")
+    print(f"history size   {history_kb(size):>10} (tracemalloc {history_kb(allocated)}), "
+          f"budget {history_kb(MAX_BYTES)}")
+    print(f"record         {record_ms:>8.4f}ms per frame, budget {MAX_RECORD_MS}ms")
+    print(f"rewind         {rewind_ms:>8.3f}ms for {rewound} frames at worst, budget {MAX_REWIND_MS:.1f}ms")
+
+    failures = []
+    if max(size, allocated) > MAX_BYTES:
+        failures.append("memory")
+    if record_ms > MAX_RECORD_MS:
+        failures.append("record time")
+    if rewind_ms > MAX_REWIND_MS:
+        failures.append("rewind time")
+    if failures:
+        print(f"Over budget: {', '.join(failures)}")
+        sys.exit(1)
+
+def history_kb(size):
+    return f"{size / 1024:.1f}KB"
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# boss.py
+# The boss of levels 5 and 10: it hovers at the far end of the level and
+# works through BOSS_SCRIPT, a cycle of timed attack patterns, filling the
+# level with projectiles. Clicking it damages it.
+import math
+from array import array
+from itertools import islice
+import pygame
+from constants import *
+
+# (pattern, seconds it runs, seconds between volleys)
+BOSS_SCRIPT = (
+    ("ring", 3.0, 0.5),
+    ("spiral", 4.0, 0.05),
+    ("aimed", 3.0, 0.25),
+)
+
+class ProjectilePool:
+    # Up to capacity projectiles as parallel arrays allocated once. Live
+    # projectiles are packed at the front and a removed one is replaced by
+    # the last, so firing and expiring never allocate.
+    def __init__(self, capacity=MAX_PROJECTILES, size=PROJECTILE_SIZE):
+        self.capacity = capacity
+        self.size = size
+        self.count = 0
+        self.xs = array('d', bytes(8 * capacity))
+        self.ys = array('d', bytes(8 * capacity))
+        self.vx = array('d', bytes(8 * capacity))
+        self.vy = array('d', bytes(8 * capacity))
+        # A colorkeyed, RLE encoded sprite blits much faster than per pixel alpha
+        self.image = pygame.Surface((size, size))
+        self.image.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+        pygame.draw.circle(self.image, (255, 220, 0), (size // 2, size // 2), size // 2)
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def spawn(self, x, y, vx, vy):
+        # False when the pool is full and the shot is dropped
+        i = self.count
+        if i == self.capacity:
+            return False
+        self.xs[i] = x
+        self.ys[i] = y
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.count = i + 1
+        return True
+
+    def live(self, column):
+        # Iterates the live part of a column without copying it
+        return islice(column, self.count)
+
+    def move(self, dt=FRAME_TIME):
+        # Speeds are in pixels per 1/FPS second, like the enemies'
+        n = self.count
+        if n == 0:
+            return
+        scale = dt * FPS
+        live = self.live
+        self.xs[:n] = array('d', [x + v * scale for x, v in zip(live(self.xs), live(self.vx))])
+        self.ys[:n] = array('d', [y + v * scale for y, v in zip(live(self.ys), live(self.vy))])
+
+    def collide(self, rect, bounds):
+        # Removes the projectiles that hit rect or left bounds and returns
+        # how many hit rect
+        size = self.size
+        left, top, right, bottom = rect.left - size, rect.top - size, rect.right, rect.bottom
+        min_x, min_y, max_x, max_y = bounds.left - size, bounds.top - size, bounds.right, bounds.bottom
+        xs, ys = self.xs, self.ys
+        gone = [i for i, (x, y) in enumerate(zip(self.live(xs), self.live(ys)))
+                if not (min_x < x < max_x and min_y < y < max_y) or (left < x < right and top < y < bottom)]
+        if not gone:
+            return 0
+        hits = sum(1 for i in gone if left < xs[i] < right and top < ys[i] < bottom)
+        self.remove(gone)
+        return hits
+
+    def remove(self, indices):
+        # indices in ascending order. Going backwards, the last projectile
+        # moved into a slot is always one that stays.
+        xs, ys, vx, vy = self.xs, self.ys, self.vx, self.vy
+        for i in reversed(indices):
+            last = self.count - 1
+            xs[i] = xs[last]
+            ys[i] = ys[last]
+            vx[i] = vx[last]
+            vy[i] = vy[last]
+            self.count = last
+
+    def overlapping(self, rect):
+        size = self.size
+        left, top, right, bottom = rect.left - size, rect.top - size, rect.right, rect.bottom
+        return [i for i, (x, y) in enumerate(zip(self.live(self.xs), self.live(self.ys)))
+                if left < x < right and top < y < bottom]
+
+    def rect(self, index):
+        return pygame.Rect(self.xs[index], self.ys[index], self.size, self.size)
+
+    def draw(self, screen, offset_x=0, area=None):
+        # The projectiles overlapping area (all of them without one) in a
+        # single batched blit
+        image = self.image
+        positions = zip(self.live(self.xs), self.live(self.ys))
+        if area is not None:
+            size = self.size
+            left, top, right, bottom = area.left - size, area.top - size, area.right, area.bottom
+            positions = [(x, y) for x, y in positions if left < x < right and top < y < bottom]
+        screen.blits([(image, (int(x) - offset_x, int(y))) for x, y in positions], False)
+
+def fire_ring(boss, target):
+    # Evenly spaced around the boss, turned a little each volley
+    count = 24
+    turn = boss.volleys * 0.13
+    for k in range(count):
+        angle = turn + 2 * math.pi * k / count
+        boss.fire(math.cos(angle) * 3, math.sin(angle) * 3)
+
+def fire_spiral(boss, target):
+    for arm in range(3):
+        angle = boss.volleys * 0.3 + arm * 2 * math.pi / 3
+        boss.fire(math.cos(angle) * 4, math.sin(angle) * 4)
+
+def fire_aimed(boss, target):
+    # A fan of five aimed at the target
+    cx, cy = boss.rect.center
+    tx, ty = target.center
+    angle = math.atan2(ty - cy, tx - cx)
+    for k in range(-2, 3):
+        boss.fire(math.cos(angle + k * 0.15) * 5, math.sin(angle + k * 0.15) * 5)
+
+PATTERNS = {"ring": fire_ring, "spiral": fire_spiral, "aimed": fire_aimed}
+
+class Boss:
+    def __init__(self, level_number=5, projectiles=None, world_width=LEVEL_WIDTH):
+        self.projectiles = projectiles if projectiles is not None else ProjectilePool()
+        self.rect = pygame.Rect(0, 0, BOSS_SIZE, BOSS_SIZE)
+        self.bounds = pygame.Rect(0, 0, world_width, HEIGHT)
+        self.color = (160, 0, 200)
+        self.reset(level_number)
+
+    def reset(self, level_number, world_width=None):
+        # A world_width moves the boss to a level of that width
+        if world_width is not None:
+            self.bounds.width = world_width
+        self.max_health = BOSS_HEALTH * max(1, level_number // 5)
+        self.health = self.max_health
+        self.clock = 0.0  # Seconds of boss time, which drives everything else
+        self.next_volley = 0.0
+        self.volleys = 0
+        self.projectiles.clear()
+        self.place()
+
+    def place(self):
+        # Hovers up and down near the end of the level
+        self.rect.x = self.bounds.right - BOSS_SIZE - TILE_SIZE
+        self.rect.y = round((HEIGHT - BOSS_SIZE) / 2 * (1 + 0.8 * math.sin(self.clock)))
+
+    def pattern(self):
+        # The script entry running at the current clock
+        cycle = sum(seconds for _, seconds, _ in BOSS_SCRIPT)
+        t = self.clock % cycle
+        for entry in BOSS_SCRIPT:
+            if t < entry[1]:
+                return entry
+            t -= entry[1]
+        return BOSS_SCRIPT[-1]
+
+    def fire(self, vx, vy):
+        half = self.projectiles.size / 2
+        self.projectiles.spawn(self.rect.centerx - half, self.rect.centery - half, vx, vy)
+
+    def update(self, dt, target):
+        # Advances the boss and its projectiles by dt and returns how many
+        # projectiles hit target
+        self.clock += dt
+        self.place()
+        while self.next_volley <= self.clock:
+            name, _, interval = self.pattern()
+            PATTERNS[name](self, target)
+            self.volleys += 1
+            self.next_volley += interval
+        self.projectiles.move(dt)
+        return self.projectiles.collide(target, self.bounds)
+
+    def hit(self, damage=BOSS_CLICK_DAMAGE):
+        # True once the boss is defeated
+        self.health = max(0, self.health - damage)
+        if self.health == 0:
+            self.projectiles.clear()
+        return self.health == 0
+
+    def draw(self, screen, offset_x=0):
+        rect = self.rect.move(-offset_x, 0)
+        pygame.draw.rect(screen, self.color, rect)
+        # Health bar along the top
+        bar = pygame.Rect(rect.x + 4, rect.y + 4, (rect.width - 8) * self.health // self.max_health, 6)
+        pygame.draw.rect(screen, (0, 255, 0), bar)
@@ -0,0 +1,29 @@
+# camera.py
+import pygame
+from constants import *
+
+class Camera:
+    # Horizontal camera over a level wider than the screen. The world uses
+    # level coordinates. Anything drawn is shifted by -x.
+    def __init__(self, width=WIDTH, height=HEIGHT, world_width=LEVEL_WIDTH):
+        self.x = 0
+        self.width = width
+        self.height = height
+        self.world_width = world_width
+
+    @property
+    def view(self):
+        return pygame.Rect(self.x, 0, self.width, self.height)
+
+    def follow(self, rect):
+        # Keep the target centred, without showing anything past the level
+        self.x = max(0, min(rect.centerx - self.width // 2, self.world_width - self.width))
+
+    def to_screen(self, rect):
+        return rect.move(-self.x, 0)
+
+    def to_world(self, pos):
+        return (pos[0] + self.x, pos[1])
+
+    def is_visible(self, rect):
+        return self.view.colliderect(rect)
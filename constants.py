@@ -3,9 +3,43 @@ UI_HEIGHT = 100  # Height for the UI section
 TOTAL_HEIGHT = HEIGHT + UI_HEIGHT  # Total height including the UI section
 PLAYER_SIZE = 50
 PLAYER_SPEED = 5
-SCROLL_SPEED = 2
 LEVEL_WIDTH = WIDTH * 2
 TILE_SIZE = 100
 NUM_TILE_IMAGES = 5
 LEVEL_TIME_LIMIT = 60
 ENEMY_SIZE = 20  # or whatever size you prefer
+FPS = 60
+FRAME_TIME = 1 / FPS  # Fixed simulation timestep in seconds
+MAX_FRAME_TIME = 0.25  # Cap on real time fed to the accumulator per frame
+DIRTY_RECTS = True  # Redraw only changed regions instead of the whole screen
+ASSET_CACHE_SIZE = 64  # Number of scaled images kept by the asset manager
+THEMES = ["Ancient Egypt", "Medieval Europe", "Present Day", "Distant Future"]
+TITLE_DURATION = 2  # Seconds the title screen is shown
+GAME_OVER_DURATION = 2  # Seconds the game over screen is shown
+TEXT_CACHE_SIZE = 256  # Number of rendered text surfaces kept
+VISIBLE_COLUMNS = (WIDTH + TILE_SIZE - 1) // TILE_SIZE  # Tile columns on the first screen
+PROFILE_HISTORY = 300  # Frames kept for the profiler's rolling percentiles
+PROFILE_OVERLAY_INTERVAL = 30  # Frames between profiler overlay refreshes
+DIRTY_RECT_LIMIT = 64  # More changed regions than this and a full redraw is cheaper
+AUTOSAVE_INTERVAL = 5  # Seconds of play between autosaves
+SLOW_TIME_SCALE = 0.5  # World speed while Slow Time is active
+TIME_POWER_DURATION = 5  # Seconds Slow Time and Time Stop last
+TIME_POWER_RECHARGE = 10  # Seconds before a time power can be used again
+REWIND_SECONDS = 3  # How far back Rewind goes
+REWIND_FRAMES = REWIND_SECONDS * FPS
+KEYFRAME_INTERVAL = 5  # Frames between full keyframes in the rewind history; a rewind replays fewer than this
+BOSS_SIZE = 120
+BOSS_HEALTH = 100  # Per five levels, so the level 10 boss has twice as much
+BOSS_CLICK_DAMAGE = 5
+MAX_PROJECTILES = 4096  # Capacity of the boss's projectile pool
+PROJECTILE_SIZE = 8
+AUDIO_CACHE_BYTES = 8 * 1024 * 1024  # Decoded sound effects kept in memory
+MUSIC_VOLUME = 0.5
+PLAYER_START = (0, HEIGHT // 2 - PLAYER_SIZE // 2)  # Top left of the player on each level
+DOOR_POSITION = (WIDTH - TILE_SIZE, HEIGHT // 2 - TILE_SIZE // 2)
+# Tile types that can't be walked through by the player or the enemies. None
+# yet, so until some are listed every cell is open: enemies chase in straight
+# lines and the reachability checks of levels.py and levelgen.py pass anything.
+SOLID_TILE_TYPES = ()
+CHASE_DISTANCE = 2  # Tiles from the player within which enemies chase it
+TIME_POWERS = [None, "Slow Time", "Rewind", "Time Stop"]  # Power granted on each group of three levels
@@ -6,5 +6,5 @@ class Door:
         self.image = pygame.Surface((width, height))
         self.image.fill((0, 255, 0))  # Green color for the door
 
-    def draw(self, screen):
-        screen.blit(self.image, self.rect.topleft)
\ No newline at end of file
+    def draw(self, screen, offset_x=0):
+        screen.blit(self.image, (self.rect.x - offset_x, self.rect.y))
\ No newline at end of file
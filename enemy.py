@@ -1,18 +1,128 @@
 import random
+from array import array
 import pygame
 from constants import *
 
 class Enemy:
-  def __init__(self, x, y, width, height):
-      self.rect = pygame.Rect(x, y, width, height)
+  # A view of one enemy in an EnemySwarm
+  __slots__ = ("swarm", "index")
+
+  def __init__(self, swarm, index):
+      self.swarm = swarm
+      self.index = index
+
+  @property
+  def rect(self):
+      swarm = self.swarm
+      i = self.index
+      return pygame.Rect(swarm.xs[i], swarm.ys[i], swarm.widths[i], swarm.heights[i])
+
+  @property
+  def speed(self):
+      return self.swarm.vx[self.index]
+
+  @property
+  def color(self):
+      return self.swarm.color
+
+  def draw(self, screen, offset_x=0):
+      pygame.draw.rect(screen, self.color, self.rect.move(-offset_x, 0))
+
+class EnemySwarm:
+  # All enemies of a level as parallel arrays of positions, sizes and
+  # velocities, moved and collision-tested in bulk instead of per object
+  def __init__(self):
+      self.xs = array('d')
+      self.ys = array('d')
+      self.widths = array('d')
+      self.heights = array('d')
+      self.vx = array('d')
       self.color = (255, 0, 0)  # Red color for enemies
-      self.speed = random.randint(1, 3)  # Random speed for each enemy
 
-  def move(self):
-      # Simple movement: move left and right
-      self.rect.x += self.speed
-      if self.rect.right > WIDTH or self.rect.left < 0:
-          self.speed = -self.speed
+  def __len__(self):
+      return len(self.xs)
+
+  def __getitem__(self, index):
+      return Enemy(self, index)
+
+  def __iter__(self):
+      for index in range(len(self.xs)):
+          yield Enemy(self, index)
+
+  def clear(self):
+      for column in (self.xs, self.ys, self.widths, self.heights, self.vx):
+          del column[:]
+
+  def spawn(self, x, y, width, height, speed=None):
+      self.xs.append(x)
+      self.ys.append(y)
+      self.widths.append(width)
+      self.heights.append(height)
+      self.vx.append(speed if speed is not None else random.randint(1, 3))  # Random speed for each enemy
+
+  def populate(self, count, rng=random, world_width=LEVEL_WIDTH):
+      # Replace the swarm with count enemies at random places in the level
+      self.clear()
+      for _ in range(count):
+          x = rng.randint(0, world_width - ENEMY_SIZE)
+          y = rng.randint(0, HEIGHT - ENEMY_SIZE)
+          self.spawn(x, y, ENEMY_SIZE, ENEMY_SIZE, rng.randint(1, 3))
+
+  def move(self, dt=FRAME_TIME, world_width=LEVEL_WIDTH, field=None):
+      # Simple movement: patrol left and right across the level, bouncing
+      # off its edges. Speeds are in pixels per 1/FPS second. With a flow
+      # field, enemies within CHASE_DISTANCE steps of its target follow it
+      # at the same speed instead.
+      scale = dt * FPS
+      chasers = self.chasers(field) if field is not None else ()
+      xs = array('d', [x + v * scale for x, v in zip(self.xs, self.vx)])
+      for i, dx, dy in chasers:
+          speed = abs(self.vx[i])
+          xs[i] = self.xs[i] + dx * speed * scale
+          self.ys[i] += dy * speed * scale
+          # Keep patrolling the way it last chased
+          if dx:
+              self.vx[i] = speed * dx
+      self.vx = array('d', [-v if x + w > world_width or x < 0 else v
+                            for x, v, w in zip(xs, self.vx, self.widths)])
+      self.xs = xs
+
+  def chasers(self, field):
+      # (index, dx, dy) of the step each enemy near the field's target takes
+      nav = field.nav
+      size = nav.tile_size
+      rows = nav.rows
+      last_col = nav.cols - 1
+      last_row = rows - 1
+      distance = field.distance
+      # A path is never shorter than the straight column distance, so only
+      # enemies within CHASE_DISTANCE columns need a closer look
+      col = field.target // rows
+      left = (col - CHASE_DISTANCE) * size
+      right = (col + CHASE_DISTANCE + 1) * size
+      xs, ys, widths, heights = self.xs, self.ys, self.widths, self.heights
+      steps = []
+      for i in [i for i, (x, w) in enumerate(zip(xs, widths)) if left <= x + w / 2 < right]:
+          cx = xs[i] + widths[i] / 2
+          cy = ys[i] + heights[i] / 2
+          col = int(cx // size)
+          row = int(cy // size)
+          if 0 <= col <= last_col and 0 <= row <= last_row:
+              cell = col * rows + row
+          else:
+              cell = nav.cell_at(cx, cy)
+          d = distance[cell]
+          if d > CHASE_DISTANCE:
+              continue
+          if d == 0:
+              # In the target's cell: straight at it
+              steps.append((i, (field.x > cx) - (field.x < cx), (field.y > cy) - (field.y < cy)))
+          else:
+              steps.append((i, field.dx[cell], field.dy[cell]))
+      return steps
 
-  def draw(self, screen):
-      pygame.draw.rect(screen, self.color, self.rect)
\ No newline at end of file
+  def overlapping(self, rect):
+      # Indices of every enemy whose box overlaps rect, in one pass
+      left, top, right, bottom = rect.left, rect.top, rect.right, rect.bottom
+      return [i for i, (x, y, w, h) in enumerate(zip(self.xs, self.ys, self.widths, self.heights))
+              if x < right and x + w > left and y < bottom and y + h > top]
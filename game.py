@@ -1,4 +1,5 @@
 # game.py
+import math
 import os
 import pygame
 import sys
@@ -6,37 +7,96 @@ import random
 import time
 from constants import *
 from player import Player
-from tile import Tile
-from utils import load_tile_images
+from tile_layer import TileLayer
+from levelgen import LevelCache
+from prefetch import LevelPrefetcher
+from camera import Camera
+from profiler import FrameProfiler, StartupProfiler
+from utils import load_tile_images, level_theme, cover_scale
+from assets import asset_manager, resource_path
+from audio import audio, EFFECTS
+from atlas import load_atlas
 from door import Door
-from enemy import Enemy
-from ui import UI
+from enemy import EnemySwarm
+from nav import NavGrid, FlowField
+from boss import Boss
+from inputs import Inputs
+from renderer import DirtyRenderer
+from scenes import TitleScene, MenuScene, GameScene, GameOverScene
+from ui import UI, TextCache
+from history import TimeHistory
+from snapshot import take_snapshot, check_snapshot, restore_snapshot, write_snapshot, read_snapshot
 
 class Game:
-    def __init__(self):
+    def __init__(self, headless=False, dirty_rects=DIRTY_RECTS, profile=False, trace_path=None, startup=None):
+        # Only what the title and menu need is set up here. Gameplay assets
+        # are prepared in the background and finished by the first new game.
+        self.startup = startup or StartupProfiler()
+        self.start_time = self.startup.origin / 1e9
+        # Headless games run on SDL's dummy drivers and are advanced with step()
+        self.headless = headless
+        if headless:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
         print("Initializing py...")
-        pygame.init()
+        with self.startup.phase("pygame init"):
+            # Only the modules the game uses; pygame.init() would also
+            # start the joystick and audio subsystems
+            pygame.display.init()
+            pygame.font.init()
+        # Sound starts on the audio worker: the mixer opens and the effects
+        # decode there while the title is shown. Headless games are silent.
+        if not headless:
+            audio.enable()
+            audio.preload(EFFECTS)
         print("Creating time...")
         self.clock = pygame.time.Clock()
 
         print("Setting up display...")
-        self.screen = pygame.display.set_mode((WIDTH, TOTAL_HEIGHT))
+        with self.startup.phase("display"):
+            self.screen = pygame.display.set_mode((WIDTH, TOTAL_HEIGHT))
         print("Setting font...")
-        self.font = pygame.font.Font(None, 36)
-        self.ui = UI(self.font)
+        with self.startup.phase("fonts"):
+            # Fonts are created once here and shared by the HUD and every scene
+            self.fonts = {
+                "title": pygame.font.Font(None, 72),
+                "option": pygame.font.Font(None, 36),
+                "small": pygame.font.Font(None, 24),
+            }
+        self.font = self.fonts["option"]
+        self.text_cache = TextCache()
+        self.ui = UI(self.font, self.text_cache)
+        # F2 toggles between dirty-rect and full-screen redraws
+        self.dirty_rects = dirty_rects
+        self.renderer = DirtyRenderer(self)
+        # F3 toggles the frame profiler overlay
+        self.profiler = FrameProfiler(trace_path=trace_path)
+        if profile:
+            self.profiler.toggle_overlay()
         print("Initializing backgroud...")
-        self.menu_background = pygame.image.load("menu_background.png")
+        with self.startup.phase("menu background"):
+            # Scaled to the window and converted once, so the menu is one
+            # plain blit
+            background = pygame.image.load(resource_path("menu_background.png"))
+            self.menu_background = cover_scale(background, self.screen.get_size())
         print("Initializing pause menu variables")
         self.paused = False
         self.pause_options = ["Resume", "Quit to Main Menu"]
         self.pause_selected_option = 0
 
         print("Loading tile images...")
-        self.tile_images = load_tile_images(NUM_TILE_IMAGES, TILE_SIZE)
-        print("Creating tile images...")
-        self.tiles = self.create_tiles()
+        with self.startup.phase("atlas index"):
+            asset_manager.use_atlas(load_atlas())
+        self.current_theme = level_theme(1)
+        self.tile_images = None
+        self.tiles = None
+        self.tile_layer = None
+        print("Setting up level prefetch...")
+        self.level_cache = LevelCache()
+        # The next level is prepared in the background while one is played
+        self.prefetcher = LevelPrefetcher(self.level_cache)
         print("Initialize the door...")
-        self.door = Door(WIDTH - TILE_SIZE, HEIGHT // 2 - TILE_SIZE // 2, TILE_SIZE, TILE_SIZE)
+        self.door = Door(*DOOR_POSITION, TILE_SIZE, TILE_SIZE)
         self.door_open = False
         print("Initialize timer...")
         self.time_remaining = LEVEL_TIME_LIMIT
@@ -44,17 +104,17 @@ class Game:
         print("Initializing vars ...")
         self.current_level = 1
         self.max_levels = 10
-        self.background_x = 0
+        self.level_width = LEVEL_WIDTH
+        self.camera = Camera()
         self.state = "TITLE"
-        print("Game state: TITLE")
         self.menu_options = ["Play", "Quit"]
         self.selected_option = 0
 
-        print("Creating player object...")
-        self.player = Player(WIDTH / 2, HEIGHT / 2, PLAYER_SIZE, PLAYER_SIZE)
-        
+        # Created with its sprites by the first new game
+        self.player = None
+
         print("Creating enemy object...")
-        self.enemies = []
+        self.enemies = EnemySwarm()
         self.num_enemies = 3
         
         print("Initializing items...")
@@ -62,339 +122,482 @@ class Game:
         self.lore_items = []
         print("Initialize time power-up...")
         self.time_power = None # not using this...
+        self.time_scale = 1.0  # World speed, lowered by Slow Time and Time Stop
+        self.power_time_left = 0.0
+        self.power_recharge = 0.0
         print("Initialize boss state...")
         self.boss_present = False # probably don't need this.
+        # One boss, and one projectile pool, reused on every boss level
+        self.boss = Boss()
 
-        print("Initialize the level...")
-        self.initialize_level() # run this after everything else
-        #input("Press Enter to continue...")
+        print("Prefetching the first level...")
+        # Built on the prefetch worker while the title and menu are shown
+        self.prefetcher.prefetch(1, random.getrandbits(64), level_theme(1), self.num_enemies)
 
-        print("Complete.")
-        time.sleep(1)
-        os.system('clear')
+        # Shared by every enemy to find the player, rebuilt for each level's tiles
+        self.flow_field = None
+        self.flow_field_tiles = None
 
         # Initialize cooldown timer
         self.enemy_collision_cooldown = 0
 
+        # One-shot inputs gathered by handle_event() until the next step
+        self.pending_inputs = Inputs()
+        # Set by main.py --record to log every step's inputs
+        self.recorder = None
+        # The last REWIND_SECONDS of play for Rewind, and a snapshot on disk
+        # every AUTOSAVE_INTERVAL seconds when main.py sets autosave_path
+        self.history = TimeHistory()
+        self.autosave_path = None
+        self.autosave_timer = 0.0
+
+        self.scenes = {
+            "TITLE": TitleScene(self),
+            "MENU": MenuScene(self),
+            "GAME": GameScene(self),
+            "GAME_OVER": GameOverScene(self),
+        }
+        self.scene = None
+
+        self.startup.mark("game created")
+        print("Complete.")
+
     def run(self):
+        # Every state is a scene driven by this one non-blocking frame loop.
+        # Idle scenes sleep until input or their next timed change instead of
+        # running at FPS, and only redraw when they changed.
+        self.clock.tick()
+        first_frame = True
         while True:
-            if self.state == "TITLE":
-                print("Loading title...")
-                time.sleep(1)
-                os.system('clear')
-                self.show_title_screen()
-            elif self.state == "MENU":
-                print("Loading menu...")
-                time.sleep(1)
-                os.system('clear')
-                self.show_menu()
-            elif self.state == "GAME":
-                print("Loading game...")
-                time.sleep(1)
-                os.system('clear')
-                self.run_game()
-            elif self.state == "GAME_OVER":
-                print("Player lost...")
-                time.sleep(1)
-                os.system('clear')
-                self.show_game_over()
-            else:
+            if self.state == "COMPLETE":
+                self.show_ending()
+            if self.state not in self.scenes:
                 print("Error: game state not recognized")
-                time.sleep(1)
-                os.system('clear')
-                break  
-
-    def run_game(self):
-        while self.current_level <= self.max_levels and self.state == "GAME":
-            self.handle_events()
-            if not self.paused:
-                self.update()
-            self.draw()
-            self.clock.tick(60)
+                break
+            self.enter_scene()
+            if self.scene.idle:
+                events = self.wait_events(self.scene.timeout())
+                dt = self.clock.tick() / 1000
+            else:
+                events = pygame.event.get()
+                dt = min(self.clock.tick(FPS) / 1000, MAX_FRAME_TIME)
+            with self.profiler.phase("frame"):
+                with self.profiler.phase("events"):
+                    for event in events:
+                        if event.type == pygame.QUIT:
+                            self.quit()
+                        if event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+                            # Whatever was covered has to be presented again
+                            self.scene.needs_redraw = True
+                            self.renderer.invalidate()
+                        self.scene.handle_event(event)
+                        self.enter_scene()
+                with self.profiler.phase("update"):
+                    self.scene.update(dt)
+                if self.state != "COMPLETE":
+                    self.enter_scene()
+                    if not self.scene.idle or self.scene.needs_redraw:
+                        self.scene.needs_redraw = False
+                        with self.profiler.phase("draw"):
+                            self.scene.draw(self.screen)
+            self.profiler.end_frame()
+            if first_frame:
+                first_frame = False
+                print(f"First interactive frame after {(time.perf_counter() - self.start_time) * 1000:.0f} ms")
+                self.startup.mark("first frame")
+                self.startup.report()
+
+    def wait_events(self, timeout):
+        # Block until there is an event, or for at most timeout seconds
+        # (None waits for input however long it takes)
+        event = pygame.event.wait(0 if timeout is None else max(1, int(timeout * 1000)))
+        events = [] if event.type == pygame.NOEVENT else [event]
+        return events + pygame.event.get()
+
+    def enter_scene(self):
+        scene = self.scenes.get(self.state)
+        if scene is not None and scene is not self.scene:
+            print(f"Game state: {self.state}")
+            if self.state != "GAME":
+                audio.stop_music()
+            self.scene = scene
+            scene.enter()
+
+    def quit(self):
         if self.state == "GAME":
-            self.show_ending()
-        elif self.state == "GAME_OVER":
-            self.show_game_over()
-
-    def show_title_screen(self):
-        self.screen.fill((0, 0, 0))
-        title_font = pygame.font.Font(None, 72)
-        title_text = title_font.render("Temporal Labyrinth", True, (255, 255, 255))
-        self.screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, HEIGHT // 2 - title_text.get_height() // 2))
-        pygame.display.flip()
-        time.sleep(2)  # Display for 2 seconds
-        self.state = "MENU"
-
-    def show_menu(self):
-        running = True
-        while running:
-            self.screen.fill((0, 0, 0))
-            self.screen.blit(self.menu_background, (0, 0))
-
-            title_font = pygame.font.Font(None, 72)
-            option_font = pygame.font.Font(None, 36)
-
-            title_text = title_font.render("Temporal Labyrinth", True, (255, 255, 255))
-            self.screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, 100))
-
-            for i, option in enumerate(self.menu_options):
-                color = (255, 255, 255) if i == self.selected_option else (128, 128, 128)
-                option_text = option_font.render(option, True, color)
-                self.screen.blit(option_text, (WIDTH // 2 - option_text.get_width() // 2, 300 + i * 50))
-
-            pygame.display.flip()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_UP:
-                        self.selected_option = (self.selected_option - 1) % len(self.menu_options)
-                    elif event.key == pygame.K_DOWN:
-                        self.selected_option = (self.selected_option + 1) % len(self.menu_options)
-                    elif event.key == pygame.K_RETURN:
-                        if self.selected_option == 0:  # Play
-                            self.state = "GAME"
-                            self.reset_game_state()  # Reset game state for new game
-                            running = False
-                        elif self.selected_option == 1:
-                            print("Quiting...")
-                            time.sleep(1)
-                            os.system('clear')
-                            pygame.quit()
-                            sys.exit()
+            self.autosave()
+        self.profiler.close()
+        self.prefetcher.close()
+        self.level_cache.close()
+        audio.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        pygame.quit()
+        sys.exit()
 
     def show_pause_menu(self):
         pause_surface = pygame.Surface((200, 100), pygame.SRCALPHA)
         pause_surface.fill((0, 0, 0, 128))
-        option_font = pygame.font.Font(None, 24)
 
         for i, option in enumerate(self.pause_options):
             color = (255, 255, 255) if i == self.pause_selected_option else (128, 128, 128)
-            option_text = option_font.render(option, True, color)
+            option_text = self.text_cache.render(self.fonts["small"], option, True, color)
             pause_surface.blit(option_text, (100 - option_text.get_width() // 2, 20 + i * 30))
 
         self.screen.blit(pause_surface, (WIDTH // 2 - 100, HEIGHT // 2 - 50))
-        pygame.display.flip()
-
-    def handle_events(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    print("Paused.")
-                    self.paused = not self.paused
-                    self.pause_selected_option = 0
-                elif self.paused:
-                    if event.key == pygame.K_UP:
-                        self.pause_selected_option = (self.pause_selected_option - 1) % len(self.pause_options)
-                    elif event.key == pygame.K_DOWN:
-                        self.pause_selected_option = (self.pause_selected_option + 1) % len(self.pause_options)
-                    elif event.key == pygame.K_RETURN:
-                        if self.pause_selected_option == 0:
-                            self.paused = False
-                            os.system('clear') # clears pause msg
-                        elif self.pause_selected_option == 1:
-                            self.state = "TITLE"
-                            self.paused = False
-                            print("Quiting...")
-                            time.sleep(1)
-                            os.system('clear')
-                            return
-                else:
-                    if event.key == pygame.K_RETURN:
-                        self.check_tile_interaction()
-                    elif event.key == pygame.K_SPACE:
-                        self.use_time_power()
-            elif event.type == pygame.MOUSEBUTTONDOWN and not self.paused:
-                self.check_tile_click(event.pos)
-
-    def place_enemies(self):
-        self.enemies = []
-        for _ in range(self.num_enemies):
-            x = random.randint(0, WIDTH - ENEMY_SIZE)
-            y = random.randint(0, HEIGHT - ENEMY_SIZE)
-            enemy = Enemy(x, y, ENEMY_SIZE, ENEMY_SIZE)
-            self.enemies.append(enemy)
-
-    def initialize_level(self):
-        self.tiles = self.create_tiles()
-        self.place_artifact()
-        self.place_lore_items()
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_F2:
+                self.dirty_rects = not self.dirty_rects
+                self.renderer.invalidate()
+            elif event.key == pygame.K_F3:
+                self.profiler.toggle_overlay()
+                self.renderer.invalidate()
+            elif event.key == pygame.K_ESCAPE:
+                print("Paused.")
+                self.paused = not self.paused
+                self.pause_selected_option = 0
+            elif self.paused:
+                if event.key == pygame.K_UP:
+                    self.pause_selected_option = (self.pause_selected_option - 1) % len(self.pause_options)
+                elif event.key == pygame.K_DOWN:
+                    self.pause_selected_option = (self.pause_selected_option + 1) % len(self.pause_options)
+                elif event.key == pygame.K_RETURN:
+                    if self.pause_selected_option == 0:
+                        self.paused = False
+                    elif self.pause_selected_option == 1:
+                        self.paused = False
+                        self.autosave()
+                        self.state = "TITLE"
+                        print("Quiting...")
+            else:
+                if event.key == pygame.K_RETURN:
+                    self.pending_inputs.interact = True
+                elif event.key == pygame.K_SPACE:
+                    self.pending_inputs.use_power = True
+        elif event.type == pygame.MOUSEBUTTONDOWN and not self.paused:
+            # Clicks are queued in world coordinates
+            self.pending_inputs.clicks.append(self.camera.to_world(event.pos))
+
+    def poll_inputs(self):
+        # Combine held keys with the one-shot actions queued since the last step
+        inputs = Inputs.from_keys(pygame.key.get_pressed())
+        inputs.interact = self.pending_inputs.interact
+        inputs.use_power = self.pending_inputs.use_power
+        inputs.clicks = self.pending_inputs.clicks
+        self.pending_inputs = Inputs()
+        return inputs
+
+    def initialize_level(self, prepared=None):
+        # prepared is the level the prefetcher built for current_level.
+        # Without one the level is prepared now.
+        self.current_theme = level_theme(self.current_level)
+        if prepared is None or prepared.level_number != self.current_level:
+            prepared = self.prefetcher.prepare(self.current_level, random.getrandbits(64),
+                                               self.current_theme, self.num_enemies)
+        # The theme's images were loaded with the level, this only converts them
+        self.tile_images = load_tile_images(NUM_TILE_IMAGES, TILE_SIZE, self.current_theme)
+        prepared.tiles.images = self.tile_images
+        self.tiles = prepared.tiles
+        self.tile_layer = TileLayer(self.tiles)
+        self.set_level_width()
+        self.enemies = prepared.enemies
         self.set_time_power()
+        self.reset_time_power()
         self.check_boss_appearance()
         self.door_open = False  # Reset door state for the new level
+        audio.play_music(self.current_theme)
         # Reset the timer
         self.time_remaining = LEVEL_TIME_LIMIT
-        self.place_enemies()
-
-    def create_tiles(self):
-        tiles = []
-        for x in range(0, LEVEL_WIDTH, TILE_SIZE):
-            for y in range(0, HEIGHT, TILE_SIZE):
-                image = random.choice(self.tile_images)
-                tiles.append(Tile(x, y, TILE_SIZE, TILE_SIZE, image))
-        return tiles
-
-    def place_artifact(self):
-        visible_tiles = [tile for tile in self.tiles if tile.rect.x < WIDTH]
-        artifact_tile = random.choice(visible_tiles)
-        artifact_tile.has_artifact = True
-
-    def place_lore_items(self):
-        num_lore_items = random.randint(1, 3)
-        visible_tiles = [tile for tile in self.tiles if tile.rect.x < WIDTH and not tile.has_artifact]
-        for _ in range(num_lore_items):
-            if visible_tiles:
-                lore_tile = random.choice(visible_tiles)
-                lore_tile.has_lore = True
-                visible_tiles.remove(lore_tile)
+        # Start on the next level. Its seed is drawn here so seeded games
+        # don't depend on when the worker gets to it.
+        if self.current_level < self.max_levels:
+            self.prefetcher.prefetch(self.current_level + 1, random.getrandbits(64),
+                                     level_theme(self.current_level + 1), self.num_enemies)
+
+    def set_level_width(self):
+        # Levels can have any number of columns
+        self.level_width = self.tiles.cols * self.tiles.tile_size
+        self.camera.world_width = self.level_width
 
     def set_time_power(self):
-        powers = [None, "Slow Time", "Rewind", "Time Stop"]
-        self.time_power = powers[self.current_level // 3]
+        self.time_power = TIME_POWERS[self.current_level // 3]
+
+    def reset_time_power(self):
+        self.time_scale = 1.0
+        self.power_time_left = 0.0
+        self.power_recharge = 0.0
+        self.history.clear()
 
     def check_boss_appearance(self):
         self.boss_present = self.current_level in [5, 10]
+        if self.boss_present:
+            self.boss.reset(self.current_level, self.level_width)
 
     def check_tile_click(self, pos):
-        for tile in self.tiles:
-            if tile.rect.collidepoint(pos):
-                self.interact_with_tile(tile)
+        tile = self.tiles.tile_at(pos)
+        if tile:
+            self.interact_with_tile(tile)
+
+    def check_tile_interaction(self):
+        for tile in self.tiles.tiles_in_rect(self.player.rect):
+            self.interact_with_tile(tile)
 
     def interact_with_tile(self, tile):
         if tile.has_artifact:
             self.collect_artifact(tile)
         elif tile.has_lore:
             self.collect_lore(tile)
-        tile.reveal()
+        self.tiles.reveal(tile)
+        self.tile_layer.redraw_tile(tile)
+        self.renderer.invalidate(self.camera.to_screen(tile.rect))
 
     def collect_artifact(self, tile):
         print(f"Collected artifact from Level {self.current_level}")
         self.artifacts.append(f"Artifact from Level {self.current_level}")
-        tile.has_artifact = False
+        self.tiles.set_artifact(tile, False)
+        audio.play("artifact")
         self.check_all_items_collected()
 
     def collect_lore(self, tile):
         print(f"Collected lore item from Level {self.current_level}")
         self.lore_items.append(f"Lore from Level {self.current_level}")
-        tile.has_lore = False
+        self.tiles.set_lore(tile, False)
+        audio.play("lore")
         self.check_all_items_collected()
 
     def check_all_items_collected(self):
-        if all(not tile.has_artifact and not tile.has_lore for tile in self.tiles):
+        # The door stays shut while the boss is around
+        if self.tiles.items_remaining == 0 and not self.boss_present:
             self.door_open = True
+            audio.play("door")
 
     def use_time_power(self):
-        if self.time_power:
-            print(f"Using time power: {self.time_power}")
-            # Implement time power effect
+        if not self.time_power or self.power_time_left > 0 or self.power_recharge > 0:
+            return
+        print(f"Using time power: {self.time_power}")
+        if self.time_power == "Rewind":
+            # Back up to REWIND_SECONDS, replayed from the history
+            if self.history.rewind(self, REWIND_FRAMES):
+                self.renderer.invalidate()
+            self.power_recharge = TIME_POWER_RECHARGE
+        else:
+            self.time_scale = SLOW_TIME_SCALE if self.time_power == "Slow Time" else 0.0
+            self.power_time_left = TIME_POWER_DURATION
+
+    def update_time_power(self, dt):
+        # Power timers run in real game time, not the slowed world's
+        if self.power_time_left > 0:
+            self.power_time_left -= dt
+            if self.power_time_left <= 0:
+                self.power_time_left = 0.0
+                self.time_scale = 1.0
+                self.power_recharge = TIME_POWER_RECHARGE
+        elif self.power_recharge > 0:
+            self.power_recharge = max(0.0, self.power_recharge - dt)
+
+    def power_status(self):
+        if not self.time_power:
+            return None
+        if self.power_time_left > 0:
+            return f"Active: {math.ceil(self.power_time_left)}s"
+        if self.power_recharge > 0:
+            return f"Ready in {math.ceil(self.power_recharge)}s"
+        return "Ready"
 
     def advance_level(self):
         if self.current_level < self.max_levels:
             self.current_level += 1
-            self.initialize_level()
+            self.initialize_level(self.prefetcher.take())
             self.reset_player_position()  # Reset player position only
         else:
-            self.show_ending()
-
-    def scroll_background(self):
-        self.background_x -= SCROLL_SPEED
-        if self.background_x < -LEVEL_WIDTH:
-            self.background_x = 0
-        if self.background_x > 0:
-            self.background_x = 0
-        elif self.background_x < -LEVEL_WIDTH + WIDTH:
-            self.background_x = -LEVEL_WIDTH + WIDTH
+            self.state = "COMPLETE"
 
     def handle_enemy_collision(self):
         # Implement what happens when the player collides with an enemy
         # For example, lose health, restart level, etc.
         if self.enemy_collision_cooldown == 0:
             print("Player collided with an enemy!")
+            audio.play("hit")
             self.player.health -= 10  # Decrease player health by 10
             self.enemy_collision_cooldown = 60  # Cooldown period (e.g., 1 second at 60 FPS)
             if self.player.health <= 0:
                 self.state = "GAME_OVER"
 
-    def update(self):
-        keys = pygame.key.get_pressed()
-        self.player.move(keys)
-        self.scroll_background()
-        if self.boss_present:
-            self.update_boss()
+    def step(self, inputs, dt=FRAME_TIME):
+        # Advance the simulation by one fixed timestep. Needs no window or
+        # event queue, so headless games can call it as fast as they like.
+        if self.recorder is not None:
+            self.recorder.record(inputs)
+        for pos in inputs.clicks:
+            if self.boss_present and self.boss.rect.collidepoint(pos):
+                self.hit_boss()
+            else:
+                self.check_tile_click(pos)
+        if inputs.interact:
+            self.check_tile_interaction()
+        if inputs.use_power:
+            self.use_time_power()
+        self.player.move(inputs, self.level_width, self.level_nav().nav)
+        self.camera.follow(self.player.rect)
+        # Slow Time and Time Stop slow the enemies, the boss and the level
+        # timer, not the player
+        world_dt = dt * self.time_scale
+        if self.boss_present and world_dt > 0:
+            self.update_boss(world_dt)
         if self.door_open and self.player.rect.colliderect(self.door.rect):
             self.advance_level()
-        for enemy in self.enemies:
-            enemy.move()
-            if self.player.rect.colliderect(enemy.rect):
-                self.handle_enemy_collision()
+        if world_dt > 0:
+            self.move_enemies(world_dt)
+        if self.enemies.overlapping(self.player.rect):
+            self.handle_enemy_collision()
 
         # Update the cooldown timer
         if self.enemy_collision_cooldown > 0:
             self.enemy_collision_cooldown -= 1
 
         # Update the timer
-        self.time_remaining -= 1 / 60  # Assuming 60 FPS
+        self.time_remaining -= world_dt
         if self.time_remaining <= 0:
             self.state = "GAME_OVER"
-
-    def update_boss(self):
-        # Implement boss movement and attacks
-        pass
+        if self.state == "GAME":
+            self.history.record(self, self.time_scale)
+        self.update_time_power(dt)
+        self.update_snapshots(dt)
+
+    def update_snapshots(self, dt):
+        if self.state != "GAME":
+            # Nothing to continue once the game has ended
+            if self.autosave_path is not None and os.path.exists(self.autosave_path):
+                os.remove(self.autosave_path)
+            return
+        self.autosave_timer += dt
+        if self.autosave_timer >= AUTOSAVE_INTERVAL:
+            self.autosave_timer -= AUTOSAVE_INTERVAL
+            self.autosave()
+
+    def autosave(self):
+        if self.autosave_path is not None:
+            write_snapshot(self.autosave_path, take_snapshot(self))
+
+    def can_continue(self):
+        return self.autosave_path is not None and os.path.exists(self.autosave_path)
+
+    def continue_game(self):
+        # Resume from the autosave, or start over if it can't be read
+        try:
+            snapshot = read_snapshot(self.autosave_path)
+            check_snapshot(snapshot)
+        except (OSError, ValueError) as e:
+            print(f"Can't continue: {e}")
+            os.remove(self.autosave_path)
+            self.state = "GAME"
+            self.reset_game_state()
+            return
+        if self.recorder is not None:
+            self.recorder.restore(snapshot)
+        self.load_snapshot(snapshot)
+
+    def load_snapshot(self, snapshot):
+        restore_snapshot(self, snapshot)
+        audio.play_music(self.current_theme)
+        self.history.clear()
+        self.autosave_timer = 0.0
+        self.state = "GAME"
+
+    def load_player(self):
+        # Created with its sprites by the first new game
+        if self.player is None:
+            self.player = Player(WIDTH / 2, HEIGHT / 2, PLAYER_SIZE, PLAYER_SIZE)
+
+    def level_nav(self):
+        # The flow field over the current level, whose NavGrid also keeps
+        # the player out of solid tiles
+        if self.flow_field_tiles is not self.tiles:
+            self.flow_field = FlowField(NavGrid.from_tiles(self.tiles))
+            self.flow_field_tiles = self.tiles
+        return self.flow_field
+
+    def move_enemies(self, dt=FRAME_TIME):
+        field = self.level_nav()
+        field.update(*self.player.rect.center)
+        self.enemies.move(dt, self.level_width, field)
+
+    def update_boss(self, dt=FRAME_TIME):
+        if self.boss.update(dt, self.player.rect):
+            self.handle_enemy_collision()
+
+    def hit_boss(self):
+        if self.boss.hit():
+            print(f"Defeated the boss of Level {self.current_level}")
+            audio.play("boss_defeated")
+            self.boss_present = False
+            self.renderer.invalidate()
+            self.check_all_items_collected()
 
     def draw(self):
-        self.screen.fill((0, 0, 0))
-        for tile in self.tiles:
-            tile.draw(self.screen)
-        self.player.draw(self.screen)
+        if self.dirty_rects:
+            self.renderer.draw()
+        else:
+            self.draw_full()
+            if self.profiler.overlay:
+                self.draw_profiler_overlay()
+            with self.profiler.phase("present"):
+                pygame.display.flip()
+
+    def draw_full(self):
+        # Everything outside the camera's view is culled before drawing
+        camera_x = self.camera.x
+        self.tile_layer.draw(self.screen, camera_x)
+        self.player.draw(self.screen, camera_x)
         if self.boss_present:
             self.draw_boss()
-        if self.door_open:
-            self.door.draw(self.screen)
+        if self.door_open and self.camera.is_visible(self.door.rect):
+            self.door.draw(self.screen, camera_x)
         self.draw_ui()
+        for enemy in self.visible_enemies():
+            enemy.draw(self.screen, camera_x)
         if self.paused:
             self.show_pause_menu()
-        for enemy in self.enemies:
-            enemy.draw(self.screen)
-          
-        pygame.display.flip()
+
+    def visible_enemies(self):
+        return [self.enemies[i] for i in self.enemies.overlapping(self.camera.view)]
 
     def draw_boss(self):
-        # Draw the boss character
-        pass
+        camera_x = self.camera.x
+        if self.camera.is_visible(self.boss.rect):
+            self.boss.draw(self.screen, camera_x)
+        self.boss.projectiles.draw(self.screen, camera_x, self.camera.view)
+
+    def draw_profiler_overlay(self):
+        self.profiler.draw_overlay(self.screen, self.fonts["small"], self.text_cache)
 
     def draw_ui(self):
-        tiles_left = sum(1 for tile in self.tiles if tile.has_artifact or tile.has_lore)
-        self.ui.draw(self.screen, self.current_level, self.player.health, self.time_remaining, tiles_left, self.artifacts, self.lore_items, self.time_power)
-
-    def show_game_over(self):
-        self.screen.fill((0, 0, 0))
-        game_over_font = pygame.font.Font(None, 72)
-        game_over_text = game_over_font.render("Game Over", True, (255, 0, 0))
-        self.screen.blit(game_over_text, (WIDTH // 2 - game_over_text.get_width() // 2, HEIGHT // 2 - game_over_text.get_height() // 2))
-        pygame.display.flip()
-        time.sleep(2)  # Display for 2 seconds
-        self.state = "MENU"
+        with self.profiler.phase("ui"):
+            self.ui.draw(self.screen, self.current_level, self.player.health, self.time_remaining, self.tiles.items_remaining, self.artifacts, self.lore_items, self.time_power, self.power_status())
 
     def show_ending(self):
         print("Game Over - You've completed the Temporal Labyrinth!")
         print(f"Collected Artifacts: {len(self.artifacts)}")
         print(f"Lore Items Found: {len(self.lore_items)}")
-        pygame.quit()
-        sys.exit()
+        self.quit()
 
     def reset_player_position(self):
-        self.player.rect.topleft = (0, HEIGHT // 2 - PLAYER_SIZE // 2)  # Reset player position
+        self.player.rect.topleft = PLAYER_START  # Reset player position
+        self.camera.follow(self.player.rect)
 
     def reset_game_state(self):
+        if self.recorder is not None:
+            self.recorder.new_game()
+        self.load_player()
         self.reset_player_position()
         self.player.reset_health()  # Reset player health
         self.artifacts = []  # Reset artifacts
         self.lore_items = []  # Reset lore items
         self.time_power = None  # Reset time power
         self.current_level = 1  # Reset level
-        self.initialize_level()  # Initialize the first level
\ No newline at end of file
+        self.enemy_collision_cooldown = 0
+        self.paused = False
+        self.autosave_timer = 0.0
+        self.initialize_level(self.prefetcher.take())  # Initialize the first level
\ No newline at end of file
@@ -0,0 +1,142 @@
+# grid.py
+import random
+from itertools import compress
+import pygame
+from constants import TILE_SIZE
+from tile import Tile, REVEALED, ARTIFACT, LORE
+
+# Byte tables for bulk flag operations with bytes.translate()
+FLAG_SET = {flag: bytes(1 if value & flag else 0 for value in range(256)) for flag in (REVEALED, ARTIFACT, LORE)}
+FLAG_ON = {flag: bytes(value | flag for value in range(256)) for flag in (REVEALED, ARTIFACT, LORE)}
+
+class TileGrid:
+    # A level's tiles as flat column-major arrays: one byte of tile type and
+    # one byte of REVEALED/ARTIFACT/LORE flags per cell. Tile objects are
+    # views created on demand. Points and rects map straight to cell indices,
+    # and flag changes go through set_flag() so the counters stay live.
+    def __init__(self, cols, rows, types, images, tile_size=TILE_SIZE, flags=None):
+        self.cols = cols
+        self.rows = rows
+        self.tile_size = tile_size
+        self.types = bytearray(types)
+        self.flags = bytearray(flags) if flags is not None else bytearray(cols * rows)
+        self.images = images
+        self._artifacts_remaining = self.count(ARTIFACT)
+        self._lore_remaining = self.count(LORE)
+        self._revealed_count = self.count(REVEALED)
+
+    def __iter__(self):
+        for index in range(len(self.types)):
+            yield Tile(self, index)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        return Tile(self, index)
+
+    @property
+    def artifacts_remaining(self):
+        return self._artifacts_remaining
+
+    @property
+    def lore_remaining(self):
+        return self._lore_remaining
+
+    @property
+    def items_remaining(self):
+        return self._artifacts_remaining + self._lore_remaining
+
+    @property
+    def revealed_count(self):
+        return self._revealed_count
+
+    def rect_of(self, index):
+        col, row = divmod(index, self.rows)
+        size = self.tile_size
+        return pygame.Rect(col * size, row * size, size, size)
+
+    def set_flag(self, index, flag, value):
+        old = self.flags[index]
+        new = old | flag if value else old & ~flag
+        if new == old:
+            return
+        self.flags[index] = new
+        change = 1 if value else -1
+        if flag == ARTIFACT:
+            self._artifacts_remaining += change
+        elif flag == LORE:
+            self._lore_remaining += change
+        elif flag == REVEALED:
+            self._revealed_count += change
+
+    def set_artifact(self, tile, value):
+        self.set_flag(tile.index, ARTIFACT, value)
+
+    def set_lore(self, tile, value):
+        self.set_flag(tile.index, LORE, value)
+
+    def reveal(self, tile):
+        self.set_flag(tile.index, REVEALED, True)
+
+    def count(self, flag, start=0, end=None):
+        return self.flags[start:end].translate(FLAG_SET[flag]).count(1)
+
+    def reveal_rect(self, rect):
+        # Reveal every cell overlapping rect, one column slice at a time
+        for col, first_row, last_row in self.column_spans(rect):
+            start = col * self.rows + first_row
+            end = col * self.rows + last_row + 1
+            self._revealed_count -= self.count(REVEALED, start, end)
+            self.flags[start:end] = self.flags[start:end].translate(FLAG_ON[REVEALED])
+            self._revealed_count += end - start
+
+    def random_cells(self, count, cols=None, exclude=0, rng=random):
+        # Up to count distinct cells among the first cols columns that have
+        # none of the exclude flags set, drawn the way random.choice() would
+        end = (self.cols if cols is None else min(cols, self.cols)) * self.rows
+        if exclude:
+            allowed = self.flags[:end].translate(bytes(0 if value & exclude else 1 for value in range(256)))
+            candidates = list(compress(range(end), allowed))
+        else:
+            candidates = list(range(end))
+        picked = []
+        for _ in range(count):
+            if not candidates:
+                break
+            index = rng.choice(candidates)
+            candidates.remove(index)
+            picked.append(index)
+        return picked
+
+    def index_at(self, pos):
+        col = int(pos[0]) // self.tile_size
+        row = int(pos[1]) // self.tile_size
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return col * self.rows + row
+        return None
+
+    def tile_at(self, pos):
+        index = self.index_at(pos)
+        return Tile(self, index) if index is not None else None
+
+    def column_spans(self, rect):
+        # (col, first_row, last_row) for every column rect overlaps, using
+        # the same rule as Rect.colliderect: touching edges don't count
+        if rect.width <= 0 or rect.height <= 0:
+            return []
+        first_col = max(rect.left // self.tile_size, 0)
+        last_col = min((rect.right - 1) // self.tile_size, self.cols - 1)
+        first_row = max(rect.top // self.tile_size, 0)
+        last_row = min((rect.bottom - 1) // self.tile_size, self.rows - 1)
+        if first_row > last_row:
+            return []
+        return [(col, first_row, last_row) for col in range(first_col, last_col + 1)]
+
+    def indices_in_rect(self, rect):
+        return [col * self.rows + row
+                for col, first_row, last_row in self.column_spans(rect)
+                for row in range(first_row, last_row + 1)]
+
+    def tiles_in_rect(self, rect):
+        return [Tile(self, index) for index in self.indices_in_rect(rect)]
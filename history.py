@@ -0,0 +1,144 @@
+# history.py
+# Per-frame history of the player, the enemies and the level timer, for the
+# Rewind time power.
+#
+# History is kept in blocks. A block opens with a keyframe of the full state
+# and is followed by one small delta record per simulated frame:
+#   player dx, dy (b), flags (B): the frame's time scale code in the low two
+#   bits, and HEALTH when health or the collision cooldown changed other
+#   than by counting down, followed by health (i) and cooldown (H)
+# Enemies and the timer aren't stored per frame at all: stepping them again
+# from the keyframe with each frame's time scale and player position gives
+# exactly the same floats, so a frame is rebuilt by replaying at most one
+# block.
+import struct
+from array import array
+from collections import deque
+from constants import *
+
+KEYFRAME = struct.Struct("<iiiHdI")  # player x, y, health, cooldown, time remaining, enemy count
+DELTA = struct.Struct("<bbB")
+VITALS = struct.Struct("<iH")
+HEALTH = 4
+
+# Time scale codes; only these scales can be recorded
+TIME_SCALES = (1.0, SLOW_TIME_SCALE, 0.0)
+
+class Block:
+    __slots__ = ("keyframe", "deltas", "frames")
+
+    def __init__(self, keyframe):
+        self.keyframe = keyframe
+        self.deltas = bytearray()
+        self.frames = 1  # Counting the keyframe
+
+    def __len__(self):
+        return self.frames
+
+class TimeHistory:
+    def __init__(self, frames=REWIND_FRAMES, keyframe_interval=KEYFRAME_INTERVAL):
+        self.frames = frames
+        self.keyframe_interval = keyframe_interval
+        self.blocks = deque()
+        self.count = 0
+        self.last = None
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.blocks.clear()
+        self.count = 0
+        self.last = None
+
+    def record(self, game, time_scale):
+        # Called once per simulated frame, after the frame's update
+        player = game.player
+        x, y = player.rect.x, player.rect.y
+        health, cooldown = player.health, game.enemy_collision_cooldown
+        last = self.last
+        # A new block every keyframe_interval frames, or when the player
+        # moved further than a delta can hold
+        if (last is None or len(self.blocks[-1]) >= self.keyframe_interval
+                or abs(x - last[0]) > 127 or abs(y - last[1]) > 127):
+            self.blocks.append(Block(self.keyframe(game)))
+        else:
+            block = self.blocks[-1]
+            flags = TIME_SCALES.index(time_scale)
+            expected_cooldown = last[3] - 1 if last[3] > 0 else 0
+            block.frames += 1
+            if health != last[2] or cooldown != expected_cooldown:
+                block.deltas += DELTA.pack(x - last[0], y - last[1], flags | HEALTH)
+                block.deltas += VITALS.pack(health, cooldown)
+            else:
+                block.deltas += DELTA.pack(x - last[0], y - last[1], flags)
+        self.last = (x, y, health, cooldown)
+        self.count += 1
+        # Drop whole blocks once the oldest is no longer needed
+        while self.count - len(self.blocks[0]) > self.frames:
+            self.count -= len(self.blocks.popleft())
+
+    def keyframe(self, game):
+        enemies = game.enemies
+        return (KEYFRAME.pack(game.player.rect.x, game.player.rect.y, game.player.health,
+                              game.enemy_collision_cooldown, game.time_remaining, len(enemies))
+                + enemies.xs.tobytes() + enemies.ys.tobytes() + enemies.vx.tobytes())
+
+    def rewind(self, game, frames):
+        # Puts the player, enemies and timer back to how they were `frames`
+        # frames ago (or as far back as the history goes) and forgets the
+        # frames after that. Returns the number of frames rewound.
+        frames = min(frames, self.count - 1)
+        if frames <= 0:
+            return 0
+        target = self.count - 1 - frames
+        while target < self.count - len(self.blocks[-1]):
+            self.count -= len(self.blocks.pop())
+        block = self.blocks[-1]
+        steps = target - (self.count - len(block))
+
+        x, y, health, cooldown, time_remaining, enemy_count = KEYFRAME.unpack_from(block.keyframe)
+        pos = KEYFRAME.size
+        columns = []
+        for _ in range(3):
+            column = array("d")
+            column.frombytes(block.keyframe[pos:pos + 8 * enemy_count])
+            columns.append(column)
+            pos += 8 * enemy_count
+        enemies = game.enemies
+        enemies.xs, enemies.ys, enemies.vx = columns
+
+        # Replay the block's frames the way Game.step() ran them, enemies
+        # chasing the player where it was then
+        player = game.player
+        deltas = block.deltas
+        pos = 0
+        for _ in range(steps):
+            dx, dy, flags = DELTA.unpack_from(deltas, pos)
+            pos += DELTA.size
+            x += dx
+            y += dy
+            if cooldown > 0:
+                cooldown -= 1
+            if flags & HEALTH:
+                health, cooldown = VITALS.unpack_from(deltas, pos)
+                pos += VITALS.size
+            world_dt = FRAME_TIME * TIME_SCALES[flags & 3]
+            if world_dt:
+                player.rect.topleft = (x, y)
+                game.move_enemies(world_dt)
+            time_remaining -= world_dt
+
+        del block.deltas[pos:]
+        self.count -= block.frames - 1 - steps
+        block.frames = steps + 1
+
+        player.rect.topleft = (x, y)
+        player.health = health
+        game.enemy_collision_cooldown = cooldown
+        game.time_remaining = time_remaining
+        self.last = (x, y, health, cooldown)
+        return frames
+
+    def nbytes(self):
+        return sum(len(block.keyframe) + len(block.deltas) for block in self.blocks)
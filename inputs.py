@@ -0,0 +1,17 @@
+# inputs.py
+import pygame
+
+class Inputs:
+    def __init__(self, left=False, right=False, up=False, down=False, interact=False, use_power=False, clicks=None):
+        self.left = left
+        self.right = right
+        self.up = up
+        self.down = down
+        # One-shot actions, consumed by a single simulation step
+        self.interact = interact
+        self.use_power = use_power
+        self.clicks = clicks if clicks is not None else []
+
+    @classmethod
+    def from_keys(cls, keys):
+        return cls(keys[pygame.K_LEFT], keys[pygame.K_RIGHT], keys[pygame.K_UP], keys[pygame.K_DOWN])
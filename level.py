@@ -1,145 +1,51 @@
 import pygame
 import random
 from constants import *
-from tile import Tile
-from utils import load_tile_images
+from tile import ARTIFACT
+from tile_layer import TileLayer
+from grid import TileGrid
+from utils import load_tile_images, level_theme
+from levels import get_level_pack
+from boss import Boss
 
 class Level:
     def __init__(self, level_number):
         self.current_level = level_number
-        self.tile_maps = {
-            1: [
-                [1, 2, 1, 0, 1, 2, 1, 0],
-                [2, 1, 0, 2, 1, 2, 1, 0],
-                [0, 2, 1, 1, 1, 2, 1, 0],
-                [1, 0, 2, 0, 1, 2, 1, 0],
-                [2, 1, 0, 2, 1, 2, 1, 0],
-                [0, 2, 1, 1, 1, 2, 1, 0],
-                [1, 0, 2, 0, 1, 2, 1, 0]
-            ],
-            2: [
-                [1, 2, 1, 0, 1, 2, 1, 0],
-                [2, 1, 0, 2, 1, 2, 1, 0],
-                [0, 2, 1, 1, 1, 2, 1, 0],
-                [1, 0, 2, 0, 1, 2, 1, 0],
-                [2, 1, 0, 2, 1, 2, 1, 0],
-                [0, 2, 1, 1, 1, 2, 1, 0],
-                [1, 0, 2, 0, 1, 2, 1, 0]
-            ],
-            3: [
-                [1, 2, 1, 0, 1, 2, 1, 0],
-                [2, 1, 0, 2, 1, 2, 1, 0],
-                [0, 2, 1, 1, 1, 2, 1, 0],
-                [1, 0, 2, 0, 1, 2, 1, 0],
-                [2, 1, 0, 2, 1, 2, 1, 0],
-                [0, 2, 1, 1, 1, 2, 1, 0],
-                [1, 0, 2, 0, 1, 2, 1, 0]
-            ],
-            4: [
-                [1, 2, 1, 0, 1, 2, 1, 0],
-                [2, 1, 0, 2, 1, 2, 1, 0],
-                [0, 2, 1, 1, 1, 2, 1, 0],
-                [1, 0, 2, 0, 1, 2, 1, 0],
-                [2, 1, 0, 2, 1, 2, 1, 0],
-                [0, 2, 1, 1, 1, 2, 1, 0],
-                [1, 0, 2, 0, 1, 2, 1, 0]
-            ],
-            5: [
-                [1, 2, 1, 0, 1, 2, 1, 0],
-                [2, 1, 0, 2, 1, 2, 1, 0],
-                [0, 2, 1, 1, 1, 2, 1, 0],
-                [1, 0, 2, 0, 1, 2, 1, 0],
-                [2, 1, 0, 2, 1, 2, 1, 0],
-                [0, 2, 1, 1, 1, 2, 1, 0],
-                [1, 0, 2, 0, 1, 2, 1, 0]
-            ],
-            6: [
-                [1, 2, 1, 0, 1, 2, 1, 0],
-                [2, 1, 0, 2, 1, 2, 1, 0],
-                [0, 2, 1, 1, 1, 2, 1, 0],
-                [1, 0, 2, 0, 1, 2, 1, 0],
-                [2, 1, 0, 2, 1, 2, 1, 0],
-                [0, 2, 1, 1, 1, 2, 1, 0],
-                [1, 0, 2, 0, 1, 2, 1, 0]
-            ],
-            7: [
-                [1, 2, 1, 0, 1, 2, 1, 0],
-                [2, 1, 0, 2, 1, 2, 1, 0],
-                [0, 2, 1, 1, 1, 2, 1, 0],
-                [1, 0, 2, 0, 1, 2, 1, 0],
-                [2, 1, 0, 2, 1, 2, 1, 0],
-                [0, 2, 1, 1, 1, 2, 1, 0],
-                [1, 0, 2, 0, 1, 2, 1, 0]
-            ],
-            8: [
-                [1, 2, 1, 0, 1, 2, 1, 0],
-                [2, 1, 0, 2, 1, 2, 1, 0],
-                [0, 2, 1, 1, 1, 2, 1, 0],
-                [1, 0, 2, 0, 1, 2, 1, 0],
-                [2, 1, 0, 2, 1, 2, 1, 0],
-                [0, 2, 1, 1, 1, 2, 1, 0],
-                [1, 0, 2, 0, 1, 2, 1, 0]
-            ],
-            9: [
-                [1, 2, 1, 0, 1, 2, 1, 0],
-                [2, 1, 0, 2, 1, 2, 1, 0],
-                [0, 2, 1, 1, 1, 2, 1, 0],
-                [1, 0, 2, 0, 1, 2, 1, 0],
-                [2, 1, 0, 2, 1, 2, 1, 0],
-                [0, 2, 1, 1, 1, 2, 1, 0],
-                [1, 0, 2, 0, 1, 2, 1, 0]
-            ],
-            10: [
-                [1, 2, 1, 0, 1, 2, 1, 0],
-                [2, 1, 0, 2, 1, 2, 1, 0],
-                [0, 2, 1, 1, 1, 2, 1, 0],
-                [1, 0, 2, 0, 1, 2, 1, 0],
-                [2, 1, 0, 2, 1, 2, 1, 0],
-                [0, 2, 1, 1, 1, 2, 1, 0],
-                [1, 0, 2, 0, 1, 2, 1, 0]
-            ],
-            # Add more levels as needed
-        }
         self.tiles = []
         self.artifacts = []
         self.lore_items = []
         self.current_theme = None
+        self.boss_present = False
+        self.boss = Boss(level_number)
 
     def load_level(self, level_number):
+        # Level data is read from the memory-mapped level pack on demand
         self.current_level = level_number
-        self.set_level_theme()
+        cols, rows, types, flags, theme = get_level_pack().load(level_number)
+        self.set_level_theme(theme)
         self.tile_images = load_tile_images(NUM_TILE_IMAGES, TILE_SIZE, self.current_theme)
-        self.tiles = self.create_tiles()
-        self.place_artifact()
-        self.place_lore_items()
-
-    def set_level_theme(self):
-        themes = ["Ancient Egypt", "Medieval Europe", "Present Day", "Distant Future"]
-        self.current_theme = themes[(self.current_level - 1) % len(themes)]
-
-    def create_tiles(self):
-        tile_map = self.tile_maps[self.current_level]
-        tiles = []
-        for y, row in enumerate(tile_map):
-            for x, tile_type in enumerate(row):
-                image = self.tile_images[tile_type]
-                tiles.append(Tile(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE, image))
-        return tiles
+        self.tiles = TileGrid(cols, rows, types, self.tile_images, flags=flags)
+        # Levels that don't place their own items get random ones
+        if self.tiles.items_remaining == 0:
+            self.place_artifact()
+            self.place_lore_items()
+        self.tile_layer = TileLayer(self.tiles)
+        self.boss_present = self.check_boss_appearance()
+        if self.boss_present:
+            self.boss.reset(level_number, self.tiles.cols * self.tiles.tile_size)
+
+    def set_level_theme(self, theme=None):
+        self.current_theme = theme or level_theme(self.current_level)
 
     def place_artifact(self):
-        visible_tiles = [tile for tile in self.tiles if tile.rect.x < WIDTH]
-        artifact_tile = random.choice(visible_tiles)
-        artifact_tile.has_artifact = True
+        for index in self.tiles.random_cells(1, VISIBLE_COLUMNS):
+            self.tiles[index].has_artifact = True
         self.artifacts.append(f"Artifact from Level {self.current_level}")
 
     def place_lore_items(self):
         num_lore_items = random.randint(1, 3)
-        visible_tiles = [tile for tile in self.tiles if tile.rect.x < WIDTH and not tile.has_artifact]
-        for _ in range(num_lore_items):
-            if visible_tiles:
-                lore_tile = random.choice(visible_tiles)
-                lore_tile.has_lore = True
-                visible_tiles.remove(lore_tile)
+        for index in self.tiles.random_cells(num_lore_items, VISIBLE_COLUMNS, exclude=ARTIFACT):
+            self.tiles[index].has_lore = True
 
     def get_time_power(self):
         powers = [None, "Slow Time", "Rewind", "Time Stop"]
@@ -149,44 +55,45 @@ class Level:
         return self.current_level in [5, 10]
 
     def check_tile_click(self, pos, player):
-        for tile in self.tiles:
-            if tile.rect.collidepoint(pos):
-                self.interact_with_tile(tile, player)
+        tile = self.tiles.tile_at(pos)
+        if tile:
+            self.interact_with_tile(tile, player)
 
     def check_tile_interaction(self, player):
-        for tile in self.tiles:
-            if tile.rect.colliderect(player.rect):
-                self.interact_with_tile(tile, player)
+        for tile in self.tiles.tiles_in_rect(player.rect):
+            self.interact_with_tile(tile, player)
 
     def interact_with_tile(self, tile, player):
         if tile.has_artifact:
             self.collect_artifact(tile)
         elif tile.has_lore:
             self.collect_lore(tile)
-        tile.reveal()
+        self.tiles.reveal(tile)
+        self.tile_layer.redraw_tile(tile)
 
     def collect_artifact(self, tile):
         print(f"Collected artifact from {self.current_theme}")
         self.artifacts.append(f"Artifact from {self.current_theme}")
-        tile.has_artifact = False
+        self.tiles.set_artifact(tile, False)
 
     def collect_lore(self, tile):
         print(f"Collected lore item from {self.current_theme}")
         self.lore_items.append(f"Lore from {self.current_theme}")
-        tile.has_lore = False
+        self.tiles.set_lore(tile, False)
 
     def all_lore_collected(self):
-        return all(not tile.has_lore for tile in self.tiles)
+        return self.tiles.lore_remaining == 0
 
-    def update_boss(self):
-        # Implement boss movement and attacks
-        pass
+    def update_boss(self, player, dt=FRAME_TIME):
+        # Number of projectiles that hit the player this step
+        if not self.boss_present:
+            return 0
+        return self.boss.update(dt, player.rect)
 
-    def draw(self, screen):
-        screen.fill((0, 0, 0))  # Fill the screen with a solid color
-        for tile in self.tiles:
-            tile.draw(screen)
+    def draw(self, screen, camera_x=0):
+        self.tile_layer.draw(screen, camera_x)
 
-    def draw_boss(self, screen):
-        # Draw the boss character
-        pass
\ No newline at end of file
+    def draw_boss(self, screen, camera_x=0):
+        if self.boss_present:
+            self.boss.draw(screen, camera_x)
+            self.boss.projectiles.draw(screen, camera_x)
@@ -0,0 +1,159 @@
+# levelgen.py
+# Generates seeded random levels ahead of time, in parallel, into a level
+# pack in the levels.py format. The game picks levels out of that cache
+# instead of rolling tiles and items while a level starts.
+#
+#   python levelgen.py --count 5000 --seed 1    fill the default cache
+#   python levelgen.py --count 100 --theme "Present Day" --lore 2 3 --output extra.bin
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pygame
+from constants import *
+from tile import ARTIFACT, LORE
+from grid import TileGrid
+from assets import resource_path
+from levels import LevelPack, write_pack, validate_pack, NO_THEME
+from nav import level_errors
+
+CACHE_PATH = resource_path("level_resources", "generated.bin")
+MAX_ATTEMPTS = 16  # Layouts tried per level before giving up on its seed
+
+class LevelSpec:
+    # Constraints every generated level has to meet
+    def __init__(self, cols=LEVEL_WIDTH // TILE_SIZE, rows=HEIGHT // TILE_SIZE, artifacts=1,
+                 lore=(1, 3), item_columns=VISIBLE_COLUMNS, theme=None):
+        self.cols = cols
+        self.rows = rows
+        self.artifacts = artifacts
+        self.lore = lore
+        self.item_columns = item_columns
+        self.theme = theme
+
+def level_seed(seed, number):
+    # Independent seeds per level, the same however the work is split up
+    return (seed * 0x9E3779B1 + number) & 0xFFFFFFFFFFFFFFFF
+
+def generate_level(seed, spec=None):
+    # Returns the same TileGrid the game used to build in create_tiles(),
+    # place_artifact() and place_lore_items(), from its own RNG
+    spec = spec or LevelSpec()
+    rng = random.Random(seed)
+    types = bytes(rng.randrange(NUM_TILE_IMAGES) for _ in range(spec.cols * spec.rows))
+    grid = TileGrid(spec.cols, spec.rows, types, None)
+    for index in grid.random_cells(spec.artifacts, spec.item_columns, rng=rng):
+        grid.set_flag(index, ARTIFACT, True)
+    num_lore_items = rng.randint(*spec.lore)
+    for index in grid.random_cells(num_lore_items, spec.item_columns, exclude=ARTIFACT, rng=rng):
+        grid.set_flag(index, LORE, True)
+    return grid
+
+def check_level(grid, spec):
+    errors = []
+    if grid.artifacts_remaining != spec.artifacts:
+        errors.append(f"{grid.artifacts_remaining} artifacts, expected {spec.artifacts}")
+    if not spec.lore[0] <= grid.lore_remaining <= spec.lore[1]:
+        errors.append(f"{grid.lore_remaining} lore items, expected {spec.lore[0]}-{spec.lore[1]}")
+    # Items have to be where the player can walk, on the columns they are
+    # placed in
+    reachable = pygame.Rect(0, 0, min(grid.cols, spec.item_columns) * grid.tile_size, HEIGHT)
+    for index in range(len(grid)):
+        if grid.flags[index] & (ARTIFACT | LORE) and not reachable.colliderect(grid.rect_of(index)):
+            errors.append(f"item at cell {index} is out of reach")
+    return errors + level_errors(grid.cols, grid.rows, grid.types, grid.flags)
+
+def generate_record(args):
+    # Worker entry point: one (cols, rows, theme, payload) pack record.
+    # Layouts that break the spec, e.g. with an item walled off, are
+    # thrown away for the next one from the same seed.
+    seed, spec = args
+    for attempt in range(MAX_ATTEMPTS):
+        grid = generate_level(level_seed(seed, attempt) if attempt else seed, spec)
+        errors = check_level(grid, spec)
+        if not errors:
+            break
+    else:
+        raise ValueError(f"level seed {seed}: " + "; ".join(errors))
+    theme = THEMES.index(spec.theme) if spec.theme else NO_THEME
+    return grid.cols, grid.rows, theme, bytes(grid.types) + bytes(grid.flags)
+
+def generate_pack(path, count, seed=0, spec=None, workers=None):
+    spec = spec or LevelSpec()
+    jobs = [(level_seed(seed, number), spec) for number in range(count)]
+    if workers == 1:
+        records = [generate_record(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            records = list(pool.map(generate_record, jobs, chunksize=max(1, count // ((workers or os.cpu_count() or 1) * 4))))
+    write_pack(path, records)
+    return len(records)
+
+class LevelCache:
+    # Generated levels for the game. Levels are picked with the game's RNG,
+    # so seeded sessions stay reproducible for a given cache.
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.pack = None
+        self.by_theme = None
+
+    def pick(self, theme=None, rng=random):
+        # (types, flags) of a random level made for theme, or for any theme.
+        # None when there is no usable cache.
+        if self.pack is None:
+            if not os.path.exists(self.path):
+                return None
+            self.pack = LevelPack(self.path)
+            self.by_theme = {}
+            for number in range(1, len(self.pack) + 1):
+                cols, rows, types, flags, level_theme = self.pack.load(number)
+                self.by_theme.setdefault(level_theme, []).append(number)
+                types.release()
+                flags.release()
+        numbers = self.by_theme.get(theme) or self.by_theme.get(None)
+        if not numbers:
+            return None
+        cols, rows, types, flags, _ = self.pack.load(rng.choice(numbers))
+        return cols, rows, types, flags
+
+    def close(self):
+        if self.pack is not None:
+            self.pack.close()
+        self.pack = None
+        self.by_theme = None
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a cache of random levels")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--output", default=CACHE_PATH)
+    parser.add_argument("--theme", choices=THEMES, help="only use these levels for this theme")
+    parser.add_argument("--artifacts", type=int, default=1)
+    parser.add_argument("--lore", type=int, nargs=2, default=(1, 3), metavar=("MIN", "MAX"))
+    args = parser.parse_args()
+
+    spec = LevelSpec(artifacts=args.artifacts, lore=tuple(args.lore), theme=args.theme)
+    cells = spec.item_columns * spec.rows
+    if args.count < 0 or args.artifacts < 0 or args.lore[0] < 0:
+        parser.error("--count, --artifacts and --lore can't be negative")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.lore[0] > args.lore[1]:
+        parser.error("--lore MIN is greater than MAX")
+    if args.artifacts + args.lore[1] > cells:
+        parser.error(f"item counts don't fit in the {cells} cells items are placed on")
+
+    start = time.perf_counter()
+    count = generate_pack(args.output, args.count, args.seed, spec, args.workers)
+    elapsed = time.perf_counter() - start
+    errors = validate_pack(args.output)
+    for error in errors:
+        print(f"{args.output}: {error}")
+    print(f"Generated {count} levels into {args.output} in {elapsed:.2f}s ({count / elapsed:.0f} levels/s)")
+    sys.exit(1 if errors else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# levels.py
+# Levels are authored as JSON under level_resources/levels/ and compiled into
+# one binary pack that is memory-mapped on first use, so only the pages of
+# the levels actually played are ever read.
+#
+# Pack layout (little endian):
+#   header  "MCLV", version (H), level count (H)
+#   index   per level: data offset (I), cols (H), rows (H), theme (B), reserved (B)
+#   data    per level: cols * rows tile type bytes, then cols * rows flag bytes,
+#           both column-major like TileGrid
+import argparse
+import glob
+import json
+import mmap
+import os
+import struct
+import sys
+from constants import *
+from tile import REVEALED, ARTIFACT, LORE
+from assets import resource_path
+from nav import level_errors
+
+MAGIC = b"MCLV"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")
+ENTRY = struct.Struct("<IHHBB")
+NO_THEME = 255
+VALID_FLAGS = REVEALED | ARTIFACT | LORE
+
+SOURCE_DIR = resource_path("level_resources", "levels")
+PACK_PATH = resource_path("level_resources", "levels.bin")
+
+def validate_level(data):
+    errors = []
+    tiles = data.get("tiles")
+    if not isinstance(tiles, list) or not tiles or not all(isinstance(row, list) for row in tiles):
+        return ["tiles must be a non-empty list of rows"]
+    cols = len(tiles[0])
+    if cols == 0 or any(len(row) != cols for row in tiles):
+        errors.append("rows must all have the same, non-zero length")
+    if cols > 0xFFFF or len(tiles) > 0xFFFF:
+        errors.append("level is larger than 65535 tiles in a direction")
+    for y, row in enumerate(tiles):
+        for x, tile_type in enumerate(row):
+            if not isinstance(tile_type, int) or not 0 <= tile_type < NUM_TILE_IMAGES:
+                errors.append(f"tile ({x}, {y}) has type {tile_type!r}, expected 0-{NUM_TILE_IMAGES - 1}")
+    flags = data.get("flags")
+    if flags is not None:
+        if not isinstance(flags, list) or not all(isinstance(row, list) for row in flags):
+            errors.append("flags must be a list of rows")
+        elif len(flags) != len(tiles) or any(len(row) != cols for row in flags):
+            errors.append("flags must have the same shape as tiles")
+        elif any(not isinstance(value, int) or value & ~VALID_FLAGS for row in flags for value in row):
+            errors.append(f"flags may only use bits {VALID_FLAGS}")
+    theme = data.get("theme")
+    if theme is not None and theme not in THEMES:
+        errors.append(f"unknown theme {theme!r}")
+    return errors
+
+def encode_level(data):
+    tiles = data["tiles"]
+    rows = len(tiles)
+    cols = len(tiles[0])
+    flags = data.get("flags") or [[0] * cols for _ in range(rows)]
+    types = bytes(tiles[y][x] for x in range(cols) for y in range(rows))
+    flag_bytes = bytes(flags[y][x] for x in range(cols) for y in range(rows))
+    theme = THEMES.index(data["theme"]) if data.get("theme") else NO_THEME
+    return cols, rows, theme, types + flag_bytes
+
+def write_pack(path, levels):
+    # levels is a list of (cols, rows, theme, payload) records
+    offset = HEADER.size + ENTRY.size * len(levels)
+    index = []
+    for cols, rows, theme, payload in levels:
+        index.append(ENTRY.pack(offset, cols, rows, theme, 0))
+        offset += len(payload)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(levels)))
+        f.write(b"".join(index))
+        for level in levels:
+            f.write(level[3])
+    os.replace(temp_path, path)
+
+def source_files(source_dir=SOURCE_DIR):
+    return sorted(glob.glob(os.path.join(source_dir, "*.json")))
+
+def compile_levels(source_dir=SOURCE_DIR, pack_path=PACK_PATH):
+    levels = []
+    for path in source_files(source_dir):
+        with open(path) as f:
+            data = json.load(f)
+        errors = validate_level(data)
+        if errors:
+            raise ValueError(f"{path}: " + "; ".join(errors))
+        levels.append(encode_level(data))
+    write_pack(pack_path, levels)
+    return len(levels)
+
+def pack_is_stale(source_dir=SOURCE_DIR, pack_path=PACK_PATH):
+    if not os.path.exists(pack_path):
+        return True
+    built = os.path.getmtime(pack_path)
+    return os.path.getmtime(source_dir) > built or any(
+        os.path.getmtime(path) > built for path in source_files(source_dir))
+
+class LevelPack:
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.data = None
+        self.count = 0
+
+    def open(self):
+        if self.data is not None:
+            return
+        self.file = open(self.path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} level pack")
+
+    def close(self):
+        if self.data is not None:
+            self.data.close()
+            self.file.close()
+        self.data = None
+        self.file = None
+
+    def __len__(self):
+        self.open()
+        return self.count
+
+    def load(self, level_number):
+        # Returns (cols, rows, types, flags, theme) for a 1-based level number.
+        # types and flags are views into the mapped file.
+        self.open()
+        if not 1 <= level_number <= self.count:
+            raise IndexError(f"level {level_number} is not in {self.path}")
+        offset, cols, rows, theme, _ = ENTRY.unpack_from(self.data, HEADER.size + ENTRY.size * (level_number - 1))
+        cells = cols * rows
+        view = memoryview(self.data)[offset:offset + 2 * cells]
+        return cols, rows, view[:cells], view[cells:], THEMES[theme] if theme != NO_THEME else None
+
+def validate_pack(path):
+    errors = []
+    pack = LevelPack(path)
+    try:
+        pack.open()
+    except (OSError, ValueError, struct.error) as e:
+        return [str(e)]
+    size = len(pack.data)
+    if HEADER.size + ENTRY.size * pack.count > size:
+        errors.append("index runs past the end of the file")
+    else:
+        for number in range(1, pack.count + 1):
+            offset, cols, rows, theme, _ = ENTRY.unpack_from(pack.data, HEADER.size + ENTRY.size * (number - 1))
+            if offset + 2 * cols * rows > size:
+                errors.append(f"level {number}: data runs past the end of the file")
+                continue
+            if theme != NO_THEME and theme >= len(THEMES):
+                errors.append(f"level {number}: unknown theme {theme}")
+                continue
+            cols, rows, types, flags, _ = pack.load(number)
+            if max(types, default=0) >= NUM_TILE_IMAGES:
+                errors.append(f"level {number}: tile type out of range")
+            if any(value & ~VALID_FLAGS for value in set(flags.tobytes())):
+                errors.append(f"level {number}: unknown flag bits")
+            errors.extend(f"level {number}: {error}" for error in level_errors(cols, rows, types, flags))
+            types.release()
+            flags.release()
+    pack.close()
+    return errors
+
+level_pack = None
+
+def get_level_pack():
+    # The shared pack, rebuilt from the JSON sources if they changed
+    global level_pack
+    if level_pack is None:
+        if pack_is_stale():
+            compile_levels()
+        level_pack = LevelPack(PACK_PATH)
+    return level_pack
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile and validate level packs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    compile_parser = commands.add_parser("compile", help="compile JSON levels into a pack")
+    compile_parser.add_argument("--source", default=SOURCE_DIR)
+    compile_parser.add_argument("--output", default=PACK_PATH)
+    validate_parser = commands.add_parser("validate", help="check JSON levels and a compiled pack")
+    validate_parser.add_argument("--source", default=SOURCE_DIR)
+    validate_parser.add_argument("pack", nargs="?", default=PACK_PATH)
+    args = parser.parse_args()
+
+    if args.command == "compile":
+        count = compile_levels(args.source, args.output)
+        print(f"Compiled {count} levels into {args.output}")
+        return
+
+    failed = False
+    for path in source_files(args.source):
+        with open(path) as f:
+            errors = validate_level(json.load(f))
+        for error in errors:
+            print(f"{path}: {error}")
+        failed = failed or bool(errors)
+    if os.path.exists(args.pack):
+        for error in validate_pack(args.pack):
+            print(f"{args.pack}: {error}")
+            failed = True
+    print("Levels are invalid" if failed else "Levels are valid")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,40 @@
+import time
+started = time.perf_counter_ns()
+import argparse
+import pygame
+pygame_imported = time.perf_counter_ns()
 from game import Game
+from profiler import StartupProfiler
+from replay import InputRecorder, read_log, replay, seed_random
+from snapshot import AUTOSAVE_PATH
+imported = time.perf_counter_ns()
 
 if __name__ == "__main__":
-    game = Game()
-    game.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Temporal Labyrinth")
+    parser.add_argument("--profile", action="store_true", help="show the frame profiler overlay (F3)")
+    parser.add_argument("--trace", metavar="PATH", help="write per-frame phase timings as a Chrome trace")
+    parser.add_argument("--profile-startup", action="store_true", help="report import and init times up to the first frame")
+    parser.add_argument("--record", metavar="PATH", help="log the seed and every frame's inputs for replay")
+    parser.add_argument("--replay", metavar="PATH", help="replay a recorded log as fast as possible")
+    parser.add_argument("--render", action="store_true", help="draw every replayed frame")
+    parser.add_argument("--seed", type=int, help="seed the game's random number generator")
+    args = parser.parse_args()
+
+    startup = StartupProfiler(args.profile_startup, started)
+    startup.record("import pygame", started, pygame_imported)
+    startup.record("import game", pygame_imported, imported)
+
+    if args.replay:
+        seed, records = read_log(args.replay)
+        seed_random(seed)
+        game = Game(headless=not args.render, profile=args.profile, trace_path=args.trace, startup=startup)
+        startup.report()
+        replay(game, records, render=args.render)
+        game.profiler.close()
+    else:
+        seed = seed_random(args.seed) if args.record or args.seed is not None else None
+        game = Game(profile=args.profile, trace_path=args.trace, startup=startup)
+        game.autosave_path = AUTOSAVE_PATH
+        if args.record:
+            game.recorder = InputRecorder(args.record, seed)
+        game.run()
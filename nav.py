@@ -0,0 +1,136 @@
+# nav.py
+# Walkability of a level's cells, worked out from its tile types, with
+# breadth-first distance fields over it. One FlowField toward the player is
+# shared by every enemy, and the same distances check that a level's items
+# and door can be reached from where the player starts.
+from array import array
+from collections import deque
+import pygame
+from constants import *
+from tile import ARTIFACT, LORE
+
+UNREACHABLE = 0xFFFF
+
+# Tile type byte: 1 when the type can be walked through
+WALKABLE = bytes(0 if value in SOLID_TILE_TYPES else 1 for value in range(256))
+
+class NavGrid:
+    # Column-major like TileGrid, with 4-connected neighbours
+    def __init__(self, cols, rows, types, tile_size=TILE_SIZE, walkable_table=WALKABLE):
+        self.cols = cols
+        self.rows = rows
+        self.tile_size = tile_size
+        self.walkable = bytes(types).translate(walkable_table)
+        self.all_walkable = 0 not in self.walkable
+        # Per cell, (neighbour, dx, dy) of each walkable neighbour, where
+        # dx, dy is the step from the neighbour back to the cell
+        self.neighbours = [self.open_neighbours(index) for index in range(cols * rows)]
+
+    def open_neighbours(self, index):
+        rows = self.rows
+        col, row = divmod(index, rows)
+        candidates = []
+        if col > 0:
+            candidates.append((index - rows, 1, 0))
+        if col < self.cols - 1:
+            candidates.append((index + rows, -1, 0))
+        if row > 0:
+            candidates.append((index - 1, 0, 1))
+        if row < rows - 1:
+            candidates.append((index + 1, 0, -1))
+        return tuple(c for c in candidates if self.walkable[c[0]])
+
+    @classmethod
+    def from_tiles(cls, tiles):
+        return cls(tiles.cols, tiles.rows, tiles.types, tiles.tile_size)
+
+    def cell_at(self, x, y):
+        # Points outside the level map to the nearest edge cell
+        col = min(max(int(x // self.tile_size), 0), self.cols - 1)
+        row = min(max(int(y // self.tile_size), 0), self.rows - 1)
+        return col * self.rows + row
+
+    def blocks(self, rect):
+        # Whether rect overlaps a cell that can't be walked through
+        if self.all_walkable:
+            return False
+        size = self.tile_size
+        first_row = max(rect.top // size, 0)
+        last_row = min((rect.bottom - 1) // size, self.rows - 1)
+        for col in range(max(rect.left // size, 0), min((rect.right - 1) // size, self.cols - 1) + 1):
+            column = col * self.rows
+            if 0 in self.walkable[column + first_row:column + last_row + 1]:
+                return True
+        return False
+
+    def rect_of(self, index):
+        col, row = divmod(index, self.rows)
+        size = self.tile_size
+        return pygame.Rect(col * size, row * size, size, size)
+
+    def distances(self, start, dx=None, dy=None, limit=UNREACHABLE):
+        # Steps from start to every cell, UNREACHABLE where there is no way
+        # (or none within limit steps). With dx and dy arrays, also fills in
+        # each cell's step back toward start.
+        distance = array('H', [UNREACHABLE]) * (self.cols * self.rows)
+        if not self.walkable[start]:
+            return distance
+        neighbours = self.neighbours
+        distance[start] = 0
+        queue = deque((start,))
+        while queue:
+            index = queue.popleft()
+            step = distance[index] + 1
+            if step > limit:
+                break
+            for neighbour, ndx, ndy in neighbours[index]:
+                if distance[neighbour] == UNREACHABLE:
+                    distance[neighbour] = step
+                    queue.append(neighbour)
+                    if dx is not None:
+                        dx[neighbour] = ndx
+                        dy[neighbour] = ndy
+        return distance
+
+class FlowField:
+    # For every cell within limit steps of the target's cell, the direction
+    # of the next step toward it. Rebuilt only when the target moves into
+    # another cell, so any number of enemies follow it for one small
+    # breadth-first search.
+    def __init__(self, nav, limit=CHASE_DISTANCE):
+        self.nav = nav
+        self.limit = limit
+        self.target = None
+        self.target_rect = None
+        self.x = self.y = 0.0  # The target point, inside the target cell
+        self.distance = None
+        self.dx = array('b', bytes(nav.cols * nav.rows))
+        self.dy = array('b', bytes(nav.cols * nav.rows))
+
+    def update(self, x, y):
+        self.x = x
+        self.y = y
+        if self.target_rect is not None and self.target_rect.collidepoint(x, y):
+            return
+        target = self.nav.cell_at(x, y)
+        self.target_rect = self.nav.rect_of(target)
+        if target == self.target:
+            return
+        self.target = target
+        # Cells out of reach keep stale steps, but nothing there chases
+        self.distance = self.nav.distances(target, self.dx, self.dy, self.limit)
+
+def level_errors(cols, rows, types, flags, walkable_table=WALKABLE):
+    # Whatever keeps the level from being finished: items or a door that
+    # can't be reached from where the player starts
+    nav = NavGrid(cols, rows, types, walkable_table=walkable_table)
+    start = nav.cell_at(PLAYER_START[0] + PLAYER_SIZE / 2, PLAYER_START[1] + PLAYER_SIZE / 2)
+    if not nav.walkable[start]:
+        return ["the player starts inside a solid tile"]
+    door = nav.cell_at(DOOR_POSITION[0] + TILE_SIZE / 2, DOOR_POSITION[1] + TILE_SIZE / 2)
+    items = [index for index, value in enumerate(flags) if value & (ARTIFACT | LORE)]
+    distance = nav.distances(start)
+    errors = [f"item at cell {index} is unreachable" for index in items if distance[index] == UNREACHABLE]
+    if distance[door] == UNREACHABLE:
+        errors.append("the door is unreachable")
+    return errors
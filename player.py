@@ -1,15 +1,13 @@
 # player.py
-import pygame
-from constants import WIDTH, HEIGHT, PLAYER_SPEED
+from constants import LEVEL_WIDTH, HEIGHT, PLAYER_SPEED
+from assets import asset_manager
 
 class Player:
     def __init__(self, x, y, width, height):
-        # Load all player images
+        # Player images are shared through the asset cache
         self.images = {
-            'left': pygame.transform.scale(pygame.image.load("/home/mcuser/game-test/player_resources/player-left.png").convert_alpha(), (width, height)),
-            'right': pygame.transform.scale(pygame.image.load("/home/mcuser/game-test/player_resources/player-right.png").convert_alpha(), (width, height)),
-            'up': pygame.transform.scale(pygame.image.load("/home/mcuser/game-test/player_resources/player-up.png").convert_alpha(), (width, height)),
-            'down': pygame.transform.scale(pygame.image.load("/home/mcuser/game-test/player_resources/player-down.png").convert_alpha(), (width, height)),
+            direction: asset_manager.player_image(direction, (width, height))
+            for direction in ('left', 'right', 'up', 'down')
         }
         # Set initial image (you can choose any direction to start with)
         self.current_image = self.images['down']
@@ -20,33 +18,41 @@ class Player:
         # Initialize health
         self.health = 100
 
-    def move(self, keys):
+    def move(self, inputs, world_width=LEVEL_WIDTH, nav=None):
+        # With a NavGrid, a step into a solid tile is undone axis by axis,
+        # so the player slides along walls
         moved = False
-        if keys[pygame.K_LEFT]:
-            self.rect.x -= PLAYER_SPEED
+        dx = dy = 0
+        if inputs.left:
+            dx -= PLAYER_SPEED
             self.current_image = self.images['left']
             moved = True
-        if keys[pygame.K_RIGHT]:
-            self.rect.x += PLAYER_SPEED
+        if inputs.right:
+            dx += PLAYER_SPEED
             self.current_image = self.images['right']
             moved = True
-        if keys[pygame.K_UP]:
-            self.rect.y -= PLAYER_SPEED
+        if inputs.up:
+            dy -= PLAYER_SPEED
             self.current_image = self.images['up']
             moved = True
-        if keys[pygame.K_DOWN]:
-            self.rect.y += PLAYER_SPEED
+        if inputs.down:
+            dy += PLAYER_SPEED
             self.current_image = self.images['down']
             moved = True
 
-        # Ensure the player doesn't move off the screen
-        self.rect.x = max(0, min(self.rect.x, WIDTH - self.rect.width))
-        self.rect.y = max(0, min(self.rect.y, HEIGHT - self.rect.height))
+        # Ensure the player doesn't move out of the level
+        x, y = self.rect.topleft
+        self.rect.x = max(0, min(x + dx, world_width - self.rect.width))
+        if nav is not None and nav.blocks(self.rect):
+            self.rect.x = x
+        self.rect.y = max(0, min(y + dy, HEIGHT - self.rect.height))
+        if nav is not None and nav.blocks(self.rect):
+            self.rect.y = y
 
         return moved
 
-    def draw(self, screen):
-        screen.blit(self.current_image, self.rect)
+    def draw(self, screen, offset_x=0):
+        screen.blit(self.current_image, (self.rect.x - offset_x, self.rect.y))
 
     def reset_health(self):
         self.health = 100
\ No newline at end of file
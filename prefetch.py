@@ -0,0 +1,68 @@
+# prefetch.py
+import random
+from concurrent.futures import ThreadPoolExecutor
+from constants import *
+from enemy import EnemySwarm
+from grid import TileGrid
+from levelgen import generate_level
+from assets import asset_manager
+
+class PreparedLevel:
+    # Everything a level needs that doesn't depend on the display: its tiles
+    # (without images yet), its enemies and its theme's images, loaded and
+    # scaled into the asset manager
+    def __init__(self, level_number, theme, tiles, enemies):
+        self.level_number = level_number
+        self.theme = theme
+        self.tiles = tiles
+        self.enemies = enemies
+
+def prepare_level(level_number, seed, theme, num_enemies, level_cache):
+    # Everything random comes from seed, so a level is the same whichever
+    # thread prepares it and whenever that happens
+    rng = random.Random(seed)
+    level = level_cache.pick(theme, rng)
+    if level is None:
+        tiles = generate_level(rng.getrandbits(64))
+    else:
+        cols, rows, types, flags = level
+        tiles = TileGrid(cols, rows, types, None, flags=flags)
+        types.release()
+        flags.release()
+    enemies = EnemySwarm()
+    enemies.populate(num_enemies, rng, tiles.cols * tiles.tile_size)
+    asset_manager.preload(theme, NUM_TILE_IMAGES, TILE_SIZE)
+    return PreparedLevel(level_number, theme, tiles, enemies)
+
+class LevelPrefetcher:
+    # Prepares the next level on a worker thread while the current one is
+    # played. All preparation goes through the one worker, so the level
+    # cache is never used from two threads at once.
+    def __init__(self, level_cache):
+        self.level_cache = level_cache
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-prefetch")
+        self.pending = None
+        self.pending_seed = None
+
+    def prepare(self, level_number, seed, theme, num_enemies):
+        # Prepare a level now, for when nothing was prefetched
+        return self.submit(level_number, seed, theme, num_enemies).result()
+
+    def prefetch(self, level_number, seed, theme, num_enemies):
+        self.pending = self.submit(level_number, seed, theme, num_enemies)
+        self.pending_seed = seed
+
+    def submit(self, level_number, seed, theme, num_enemies):
+        return self.executor.submit(prepare_level, level_number, seed, theme, num_enemies, self.level_cache)
+
+    def take(self):
+        # The prefetched level, waiting for it if it isn't ready yet
+        pending = self.pending
+        self.pending = None
+        self.pending_seed = None
+        return pending.result() if pending is not None else None
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.pending = None
+        self.pending_seed = None
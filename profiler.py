@@ -0,0 +1,153 @@
+# profiler.py
+import json
+import time
+from array import array
+import pygame
+from constants import *
+
+class Phase:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter_ns())
+
+class NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+NULL_PHASE = NullPhase()
+
+class FrameProfiler:
+    # Opt-in per-phase frame timing. Each phase keeps its last `size` frame
+    # times in a ring buffer for rolling percentiles, and every phase can be
+    # streamed to a Chrome trace file (chrome://tracing, Perfetto).
+    def __init__(self, size=PROFILE_HISTORY, trace_path=None):
+        self.size = size
+        self.enabled = trace_path is not None
+        self.overlay = False
+        self.samples = {}
+        self.frame_times = {}
+        self.frames = 0
+        self.origin = time.perf_counter_ns()
+        self.overlay_rows = []
+        self.trace = None
+        if trace_path:
+            self.trace = open(trace_path, "w")
+            self.trace.write("[\n")
+
+    def phase(self, name):
+        if not self.enabled:
+            return NULL_PHASE
+        return Phase(self, name)
+
+    def record(self, name, start, end):
+        # Phases that run several times in a frame add up
+        self.frame_times[name] = self.frame_times.get(name, 0) + end - start
+        if self.trace:
+            event = {"name": name, "ph": "X", "pid": 1, "tid": 1,
+                     "ts": (start - self.origin) / 1000, "dur": (end - start) / 1000}
+            self.trace.write(json.dumps(event) + ",\n")
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        slot = self.frames % self.size
+        for name, duration in self.frame_times.items():
+            buffer = self.samples.get(name)
+            if buffer is None:
+                buffer = self.samples[name] = array("q", bytes(8 * self.size))
+            buffer[slot] = duration
+        # Phases that didn't run this frame count as zero
+        for name, buffer in self.samples.items():
+            if name not in self.frame_times:
+                buffer[slot] = 0
+        self.frame_times = {}
+        self.frames += 1
+        if self.overlay and self.frames % PROFILE_OVERLAY_INTERVAL == 0:
+            self.overlay_rows = self.report()
+
+    def percentiles(self, name):
+        # (p50, p95, p99) in milliseconds over the frames in the ring buffer
+        count = min(self.frames, self.size)
+        if count == 0 or name not in self.samples:
+            return (0.0, 0.0, 0.0)
+        ordered = sorted(self.samples[name][:count])
+        return tuple(ordered[min(count - 1, int(count * p))] / 1e6 for p in (0.5, 0.95, 0.99))
+
+    def report(self):
+        # Rows of (phase, p50, p95, p99) strings, times in milliseconds
+        rows = [("phase", "p50", "p95", "p99")]
+        for name in self.samples:
+            rows.append((name,) + tuple(f"{value:.2f}" for value in self.percentiles(name)))
+        return rows
+
+    def toggle_overlay(self):
+        # F3: show the overlay and collect while it is shown, or for as long
+        # as a trace is being written
+        self.overlay = not self.overlay
+        self.enabled = self.overlay or self.trace is not None
+        if self.overlay:
+            self.overlay_rows = self.report()
+
+    def overlay_rect(self):
+        return pygame.Rect(0, 0, 300, 8 + 20 * max(len(self.overlay_rows), 1))
+
+    def draw_overlay(self, screen, font, text_cache):
+        rect = self.overlay_rect()
+        background = pygame.Surface(rect.size, pygame.SRCALPHA)
+        background.fill((0, 0, 0, 170))
+        screen.blit(background, rect.topleft)
+        for i, row in enumerate(self.overlay_rows):
+            for column, value in zip((6, 130, 185, 240), row):
+                text = text_cache.render(font, value, True, (0, 255, 0))
+                screen.blit(text, (column, 4 + 20 * i))
+
+    def close(self):
+        if self.trace:
+            # A final event without a trailing comma keeps the file valid JSON
+            self.trace.write(json.dumps({"name": "end", "ph": "i", "pid": 1, "tid": 1, "s": "g",
+                                         "ts": (time.perf_counter_ns() - self.origin) / 1000}) + "\n]\n")
+            self.trace.close()
+            self.trace = None
+
+class StartupProfiler:
+    # Wall-clock time of each startup phase and of milestones such as the
+    # first frame, measured from origin (perf_counter_ns). Disabled unless
+    # main.py is run with --profile-startup.
+    def __init__(self, enabled=False, origin=None):
+        self.enabled = enabled
+        self.origin = origin if origin is not None else time.perf_counter_ns()
+        self.events = []
+
+    def phase(self, name):
+        if not self.enabled:
+            return NULL_PHASE
+        return Phase(self, name)
+
+    def record(self, name, start, end):
+        self.events.append((name, start, end))
+
+    def mark(self, name):
+        if self.enabled:
+            now = time.perf_counter_ns()
+            self.events.append((name, now, now))
+
+    def report(self):
+        if not self.enabled or not self.events:
+            return
+        print(f"{'startup phase':<24}{'at ms':>9}{'took ms':>9}")
+        for name, start, end in self.events:
+            took = f"{(end - start) / 1e6:.1f}" if end > start else ""
+            print(f"{name:<24}{(start - self.origin) / 1e6:>9.1f}{took:>9}")
+        self.events = []
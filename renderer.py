@@ -0,0 +1,140 @@
+# renderer.py
+import pygame
+from constants import *
+
+class DirtyRenderer:
+    # Redraws only the screen regions that changed since the last frame and
+    # presents them with display.update(rects) instead of a full flip.
+    def __init__(self, game):
+        self.game = game
+        self.dirty = []
+        self.full_redraw = True
+        self.sprite_rects = {}
+        self.ui_key = None
+        self.tiles = None
+        self.paused = False
+        self.door_open = False
+        self.camera_x = None
+        self.ui_rect = pygame.Rect(0, HEIGHT, WIDTH, UI_HEIGHT)
+        self.pause_rect = pygame.Rect(WIDTH // 2 - 100, HEIGHT // 2 - 50, 200, 100)
+
+    def invalidate(self, rect=None):
+        if rect is None:
+            self.full_redraw = True
+        else:
+            self.dirty.append(pygame.Rect(rect))
+
+    def draw(self):
+        game = self.game
+        # A new level, a camera move or leaving the pause menu changes too
+        # much to track
+        if game.tiles is not self.tiles or game.paused != self.paused or game.camera.x != self.camera_x:
+            self.full_redraw = True
+        self.tiles = game.tiles
+        self.paused = game.paused
+        self.camera_x = game.camera.x
+
+        # Large crowds change more regions than is worth redrawing one by one
+        moving = len(game.enemies) + (len(game.boss.projectiles) if game.boss_present else 0)
+        if len(self.dirty) + moving > DIRTY_RECT_LIMIT:
+            self.full_redraw = True
+
+        if self.full_redraw:
+            self.full_redraw = False
+            self.dirty = []
+            game.draw_full()
+            self.sprite_rects = dict(self.current_sprites())
+            self.ui_key = self.current_ui_key()
+            self.door_open = game.door_open
+            if game.profiler.overlay:
+                game.draw_profiler_overlay()
+            with game.profiler.phase("present"):
+                pygame.display.flip()
+            return
+
+        dirty = self.dirty
+        self.dirty = []
+        # Moving sprites dirty both where they were and where they are now,
+        # and sprites that left the view dirty where they were last seen
+        sprites = dict(self.current_sprites())
+        for key, (rect, image) in sprites.items():
+            previous = self.sprite_rects.get(key)
+            if previous is None:
+                dirty.append(rect)
+            elif previous != (rect, image):
+                dirty.append(rect.union(previous[0]))
+        for key, (rect, image) in self.sprite_rects.items():
+            if key not in sprites:
+                dirty.append(rect)
+        self.sprite_rects = sprites
+        if game.door_open != self.door_open:
+            dirty.append(game.camera.to_screen(game.door.rect))
+            self.door_open = game.door_open
+        if game.paused:
+            dirty.append(self.pause_rect)
+        overlay = game.profiler.overlay
+        if overlay:
+            dirty.append(game.profiler.overlay_rect())
+
+        for rect in dirty:
+            self.redraw_region(rect)
+
+        # Projectiles can reach into the UI panel, which covers them
+        ui_key = self.current_ui_key()
+        if ui_key != self.ui_key or self.ui_rect.collidelist(dirty) != -1:
+            game.draw_ui()
+            dirty.append(self.ui_rect)
+            self.ui_key = ui_key
+        if overlay:
+            game.draw_profiler_overlay()
+
+        if dirty:
+            with game.profiler.phase("present"):
+                pygame.display.update(dirty)
+
+    def redraw_region(self, rect):
+        # rect is in screen coordinates
+        game = self.game
+        screen = game.screen
+        camera_x = game.camera.x
+        world = rect.move(camera_x, 0)
+        screen.set_clip(rect)
+        game.tile_layer.draw(screen, camera_x, screen.get_clip())
+        if game.player.rect.colliderect(world):
+            game.player.draw(screen, camera_x)
+        if game.boss_present:
+            boss = game.boss
+            if boss.rect.colliderect(world):
+                boss.draw(screen, camera_x)
+            boss.projectiles.draw(screen, camera_x, world)
+        if game.door_open and game.door.rect.colliderect(world):
+            game.door.draw(screen, camera_x)
+        for i in game.enemies.overlapping(world):
+            game.enemies[i].draw(screen, camera_x)
+        if game.paused and self.pause_rect.colliderect(rect):
+            game.show_pause_menu()
+        screen.set_clip(None)
+
+    def current_sprites(self):
+        game = self.game
+        # Screen rects of everything that moves. The player's image changes
+        # with direction even when it cannot move.
+        camera = game.camera
+        yield "player", (camera.to_screen(game.player.rect), game.player.current_image)
+        for enemy in game.visible_enemies():
+            yield ("enemy", enemy.index), (camera.to_screen(enemy.rect), None)
+        if game.boss_present:
+            boss = game.boss
+            # The health bar changes without the boss moving
+            if camera.is_visible(boss.rect):
+                yield "boss", (camera.to_screen(boss.rect), boss.health)
+            projectiles = boss.projectiles
+            for i in projectiles.overlapping(camera.view):
+                yield ("projectile", i), (camera.to_screen(projectiles.rect(i)), None)
+
+    def current_ui_key(self):
+        # Tiles left only changes when an item is collected, which also
+        # changes the artifact or lore count
+        game = self.game
+        return (game.current_level, game.player.health, int(game.time_remaining),
+                len(game.artifacts), len(game.lore_items), game.time_power, game.power_status())
@@ -0,0 +1,137 @@
+# replay.py
+# Records the RNG seed and every simulation step's inputs, and plays such a
+# log back through Game.step() without waiting on the clock.
+#
+# Log format: a header of magic, version, FPS and seed, then one record per
+# step. A record is a flag byte (arrows, interact, power), followed by a
+# click count and the clicks' world coordinates when the CLICKS bit is set.
+# A NEW_GAME byte marks each reset_game_state(), and a RESTORE byte followed
+# by its length (I) and the snapshot marks continuing from a saved game.
+import random
+import struct
+import time
+import pygame
+from constants import *
+from inputs import Inputs
+
+MAGIC = b"MCRP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQ")
+CLICK = struct.Struct("<hh")
+
+LEFT, RIGHT, UP, DOWN, INTERACT, USE_POWER, CLICKS, NEW_GAME = (1 << bit for bit in range(8))
+RESTORE = NEW_GAME | 1
+LENGTH = struct.Struct("<I")
+
+class InputRecorder:
+    def __init__(self, path, seed):
+        self.path = path
+        self.seed = seed
+        self.steps = 0
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, FPS, seed))
+
+    def new_game(self):
+        self.file.write(bytes((NEW_GAME,)))
+
+    def restore(self, snapshot):
+        self.file.write(bytes((RESTORE,)) + LENGTH.pack(len(snapshot)) + snapshot)
+
+    def record(self, inputs):
+        flags = ((LEFT if inputs.left else 0) | (RIGHT if inputs.right else 0) |
+                 (UP if inputs.up else 0) | (DOWN if inputs.down else 0) |
+                 (INTERACT if inputs.interact else 0) | (USE_POWER if inputs.use_power else 0))
+        if inputs.clicks:
+            self.file.write(bytes((flags | CLICKS, len(inputs.clicks))))
+            for x, y in inputs.clicks:
+                self.file.write(CLICK.pack(x, y))
+        else:
+            self.file.write(bytes((flags,)))
+        self.steps += 1
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+            print(f"Recorded {self.steps} steps to {self.path} (seed {self.seed})")
+
+def read_log(path):
+    # Returns (seed, records). Each record is None for a new game, the
+    # snapshot bytes of a restore, or the Inputs of one step.
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path}: not an input log")
+    magic, version, fps, seed = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: not an input log (version {VERSION})")
+    if fps != FPS:
+        raise ValueError(f"{path}: recorded at {fps} FPS, the game runs at {FPS}")
+
+    records = []
+    pos = HEADER.size
+    end = len(data)
+    while pos < end:
+        flags = data[pos]
+        pos += 1
+        if flags == RESTORE:
+            if pos + LENGTH.size > end:
+                break
+            (size,) = LENGTH.unpack_from(data, pos)
+            pos += LENGTH.size
+            if pos + size > end:
+                break
+            records.append(data[pos:pos + size])
+            pos += size
+            continue
+        if flags & NEW_GAME:
+            records.append(None)
+            continue
+        clicks = []
+        if flags & CLICKS:
+            # A log cut short by a crash ends at the last whole record
+            if pos >= end or pos + 1 + data[pos] * CLICK.size > end:
+                break
+            count = data[pos]
+            pos += 1
+            for _ in range(count):
+                clicks.append(CLICK.unpack_from(data, pos))
+                pos += CLICK.size
+        records.append(Inputs(bool(flags & LEFT), bool(flags & RIGHT), bool(flags & UP), bool(flags & DOWN),
+                              bool(flags & INTERACT), bool(flags & USE_POWER), clicks))
+    return seed, records
+
+def replay(game, records, render=False):
+    # game must have been created right after random.seed(seed), as it was
+    # when recording. Steps that end a session are replayed like the
+    # original: nothing runs until the next new game.
+    steps = 0
+    start = time.perf_counter()
+    for inputs in records:
+        if inputs is None:
+            game.reset_game_state()
+            game.state = "GAME"
+            continue
+        if isinstance(inputs, bytes):
+            game.load_snapshot(inputs)
+            continue
+        if game.state != "GAME":
+            print(f"Warning: replay diverged, step {steps} recorded while in {game.state}")
+            break
+        game.step(inputs, FRAME_TIME)
+        steps += 1
+        if render:
+            pygame.event.pump()
+            game.draw()
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {steps} steps ({steps / FPS:.0f}s of play) in {elapsed:.2f}s "
+          f"({steps / max(elapsed, 1e-9):.0f} steps/s)")
+    print(f"Final state: {game.state}, level {game.current_level}, health {game.player.health}, "
+          f"artifacts {len(game.artifacts)}, lore items {len(game.lore_items)}")
+    return steps
+
+def seed_random(seed=None):
+    # Seeds the global RNG, picking a fresh seed when none is given
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(63)
+    random.seed(seed)
+    return seed
@@ -0,0 +1,152 @@
+# scenes.py
+import pygame
+from constants import *
+
+class Scene:
+    # One game state driven by Game.run()'s frame loop. Scenes never block:
+    # timed transitions count elapsed time in update(). Idle scenes only
+    # change on input or at timeout(), so the loop sleeps in between and
+    # draws them only when needs_redraw is set.
+    idle = False
+
+    def __init__(self, game):
+        self.game = game
+        self.elapsed = 0.0
+        self.needs_redraw = True
+
+    def enter(self):
+        self.elapsed = 0.0
+        self.needs_redraw = True
+
+    def timeout(self):
+        # Seconds until the scene changes by itself, None if only input
+        # changes it
+        return None
+
+    def handle_event(self, event):
+        pass
+
+    def update(self, dt):
+        self.elapsed += dt
+
+    def draw(self, screen):
+        pass
+
+class TitleScene(Scene):
+    idle = True
+
+    def timeout(self):
+        return max(0.0, TITLE_DURATION - self.elapsed)
+
+    def handle_event(self, event):
+        # Any key skips the title
+        if event.type == pygame.KEYDOWN:
+            self.game.state = "MENU"
+
+    def update(self, dt):
+        super().update(dt)
+        if self.elapsed >= TITLE_DURATION:
+            self.game.state = "MENU"
+
+    def draw(self, screen):
+        game = self.game
+        screen.fill((0, 0, 0))
+        title_text = game.text_cache.render(game.fonts["title"], "Temporal Labyrinth", True, (255, 255, 255))
+        screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, HEIGHT // 2 - title_text.get_height() // 2))
+        pygame.display.flip()
+
+class MenuScene(Scene):
+    idle = True
+
+    def enter(self):
+        super().enter()
+        # Continue is offered while there is an autosave to resume
+        game = self.game
+        game.menu_options = (["Continue"] if game.can_continue() else []) + ["Play", "Quit"]
+        game.selected_option = 0
+
+    def handle_event(self, event):
+        game = self.game
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_UP:
+                game.selected_option = (game.selected_option - 1) % len(game.menu_options)
+                self.needs_redraw = True
+            elif event.key == pygame.K_DOWN:
+                game.selected_option = (game.selected_option + 1) % len(game.menu_options)
+                self.needs_redraw = True
+            elif event.key == pygame.K_RETURN:
+                option = game.menu_options[game.selected_option]
+                if option == "Continue":
+                    game.continue_game()
+                elif option == "Play":
+                    game.state = "GAME"
+                    game.reset_game_state()  # Reset game state for new game
+                elif option == "Quit":
+                    print("Quiting...")
+                    game.quit()
+
+    def draw(self, screen):
+        game = self.game
+        screen.blit(game.menu_background, (0, 0))
+
+        title_text = game.text_cache.render(game.fonts["title"], "Temporal Labyrinth", True, (255, 255, 255))
+        screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, 100))
+
+        for i, option in enumerate(game.menu_options):
+            color = (255, 255, 255) if i == game.selected_option else (128, 128, 128)
+            option_text = game.text_cache.render(game.fonts["option"], option, True, color)
+            screen.blit(option_text, (WIDTH // 2 - option_text.get_width() // 2, 300 + i * 50))
+
+        pygame.display.flip()
+
+class GameScene(Scene):
+    # Real time is fed into an accumulator and consumed in fixed FRAME_TIME
+    # steps, so the simulation behaves the same at any rendered frame rate.
+    def __init__(self, game):
+        super().__init__(game)
+        self.accumulator = 0.0
+        self.entered = False
+
+    def enter(self):
+        super().enter()
+        self.accumulator = 0.0
+        self.entered = True
+        self.game.renderer.invalidate()
+
+    def handle_event(self, event):
+        self.game.handle_event(event)
+
+    def update(self, dt):
+        super().update(dt)
+        game = self.game
+        # The frame the scene was entered on timed the previous scene, which
+        # may have been waiting for input far longer than a frame
+        if game.paused or self.entered:
+            self.entered = False
+            self.accumulator = 0.0
+            return
+        self.accumulator += dt
+        while self.accumulator >= FRAME_TIME and game.state == "GAME" and not game.paused:
+            game.step(game.poll_inputs(), FRAME_TIME)
+            self.accumulator -= FRAME_TIME
+
+    def draw(self, screen):
+        self.game.draw()
+
+class GameOverScene(Scene):
+    idle = True
+
+    def timeout(self):
+        return max(0.0, GAME_OVER_DURATION - self.elapsed)
+
+    def update(self, dt):
+        super().update(dt)
+        if self.elapsed >= GAME_OVER_DURATION:
+            self.game.state = "MENU"
+
+    def draw(self, screen):
+        game = self.game
+        screen.fill((0, 0, 0))
+        game_over_text = game.text_cache.render(game.fonts["title"], "Game Over", True, (255, 0, 0))
+        screen.blit(game_over_text, (WIDTH // 2 - game_over_text.get_width() // 2, HEIGHT // 2 - game_over_text.get_height() // 2))
+        pygame.display.flip()
@@ -0,0 +1,63 @@
+# simulation.py
+# Runs headless play sessions through Game.step() as fast as the CPU allows,
+# for balancing experiments and regression checks.
+import argparse
+import random
+import time
+from constants import FPS, FRAME_TIME, LEVEL_TIME_LIMIT
+from game import Game
+from inputs import Inputs
+
+def random_policy(rng):
+    # Wander around, poking at tiles now and then
+    def policy(game):
+        return Inputs(
+            left=rng.random() < 0.3,
+            right=rng.random() < 0.4,
+            up=rng.random() < 0.3,
+            down=rng.random() < 0.3,
+            interact=rng.random() < 0.05,
+        )
+    return policy
+
+def run_session(game, policy, max_frames=LEVEL_TIME_LIMIT * FPS * 10):
+    game.reset_game_state()
+    game.state = "GAME"
+    frames = 0
+    while game.state == "GAME" and frames < max_frames:
+        game.step(policy(game), FRAME_TIME)
+        frames += 1
+    return {
+        "state": game.state,
+        "frames": frames,
+        "level": game.current_level,
+        "health": game.player.health,
+        "artifacts": len(game.artifacts),
+        "lore_items": len(game.lore_items),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless game sessions")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    game = Game(headless=True)
+    policy = random_policy(random.Random(args.seed))
+
+    start = time.perf_counter()
+    results = [run_session(game, policy) for _ in range(args.sessions)]
+    elapsed = time.perf_counter() - start
+
+    frames = sum(result["frames"] for result in results)
+    outcomes = {}
+    for result in results:
+        outcomes[result["state"]] = outcomes.get(result["state"], 0) + 1
+    print(f"{args.sessions} sessions, {frames} frames in {elapsed:.2f}s "
+          f"({args.sessions / elapsed:.1f} sessions/s, {frames / elapsed:.0f} frames/s)")
+    print(f"Outcomes: {outcomes}")
+    print(f"Mean level reached: {sum(r['level'] for r in results) / len(results):.2f}")
+
+if __name__ == "__main__":
+    main()
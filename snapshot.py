@@ -0,0 +1,197 @@
+# snapshot.py
+# Saves a running game to a compact binary snapshot and restores it.
+#
+# Snapshot layout (little endian):
+#   header     "MCSS", version (H)
+#   state      level (H), health (i), player x, y (i), player direction (B),
+#              time remaining (d), collision cooldown (H), door open (B),
+#              boss present (B), time power (B), time scale, power time
+#              left, power recharge (d), cols (H), rows (H)
+#   tiles      cols * rows tile type bytes, then one bitset each of the
+#              REVEALED, ARTIFACT and LORE flags, column-major like TileGrid
+#   inventory  artifact count (I) and the level of each (H), the same for lore
+#   enemies    count (I), then xs, ys, widths, heights and vx as doubles
+#   rng        the 625 words of random's Mersenne Twister state (I), whether
+#              a gaussian is pending (B) and its value (d)
+#   prefetch   whether a next level is queued (B) and its seed (Q)
+#   boss       health (i), clock, next volley (d), volleys (I), projectile
+#              count (I), then the live projectiles' xs, ys, vx and vy as doubles
+import os
+import random
+import struct
+from array import array
+from constants import *
+from tile import REVEALED, ARTIFACT, LORE
+from grid import TileGrid
+from tile_layer import TileLayer
+from utils import load_tile_images, level_theme
+from assets import resource_path
+
+AUTOSAVE_PATH = resource_path("saves", "autosave.bin")
+
+MAGIC = b"MCSS"
+VERSION = 4
+HEADER = struct.Struct("<4sH")
+STATE = struct.Struct("<HiiiBdHBBBdddHH")
+COUNT = struct.Struct("<I")
+RNG_TAIL = struct.Struct("<Bd")
+PREFETCH = struct.Struct("<BQ")
+BOSS = struct.Struct("<iddII")
+
+DIRECTIONS = ("left", "right", "up", "down")
+NO_POWER = 255
+
+# bytes.translate() tables between flag bytes and '0'/'1' digit strings
+FLAG_DIGITS = {flag: bytes(ord("1") if value & flag else ord("0") for value in range(256))
+               for flag in (REVEALED, ARTIFACT, LORE)}
+DIGIT_VALUE = {flag: bytes(flag if value == ord("1") else 0 for value in range(256))
+               for flag in (REVEALED, ARTIFACT, LORE)}
+
+def pack_bits(flags, flag):
+    # One bit per cell, cell 0 in the lowest bit of the first byte
+    digits = flags.translate(FLAG_DIGITS[flag])[::-1]
+    return int(digits or b"0", 2).to_bytes((len(flags) + 7) // 8, "little")
+
+def unpack_bits(data, cells, flag):
+    digits = bin(int.from_bytes(data, "little"))[2:].zfill(cells)[::-1].encode()
+    return digits[:cells].translate(DIGIT_VALUE[flag])
+
+def take_snapshot(game):
+    player = game.player
+    tiles = game.tiles
+    direction = next((i for i, name in enumerate(DIRECTIONS) if player.images[name] is player.current_image), 3)
+    power = TIME_POWERS.index(game.time_power) if game.time_power in TIME_POWERS[1:] else NO_POWER
+    parts = [
+        HEADER.pack(MAGIC, VERSION),
+        STATE.pack(game.current_level, player.health, player.rect.x, player.rect.y, direction,
+                   game.time_remaining, game.enemy_collision_cooldown, game.door_open, game.boss_present,
+                   power, game.time_scale, game.power_time_left, game.power_recharge, tiles.cols, tiles.rows),
+        bytes(tiles.types),
+    ]
+    for flag in (REVEALED, ARTIFACT, LORE):
+        parts.append(pack_bits(tiles.flags, flag))
+    for items in (game.artifacts, game.lore_items):
+        levels = array("H", [int(item.rsplit(" ", 1)[1]) for item in items])
+        parts.append(COUNT.pack(len(levels)) + levels.tobytes())
+    enemies = game.enemies
+    parts.append(COUNT.pack(len(enemies)))
+    for column in (enemies.xs, enemies.ys, enemies.widths, enemies.heights, enemies.vx):
+        parts.append(column.tobytes())
+    _, words, gauss = random.getstate()
+    parts.append(array("I", words).tobytes())
+    parts.append(RNG_TAIL.pack(gauss is not None, gauss or 0.0))
+    seed = game.prefetcher.pending_seed
+    parts.append(PREFETCH.pack(seed is not None, seed or 0))
+    boss = game.boss
+    projectiles = boss.projectiles
+    count = len(projectiles) if game.boss_present else 0
+    parts.append(BOSS.pack(boss.health, boss.clock, boss.next_volley, boss.volleys, count))
+    for column in (projectiles.xs, projectiles.ys, projectiles.vx, projectiles.vy):
+        parts.append(column[:count].tobytes())
+    return b"".join(parts)
+
+def check_snapshot(data):
+    if len(data) < HEADER.size or HEADER.unpack_from(data) != (MAGIC, VERSION):
+        raise ValueError(f"not a version {VERSION} snapshot")
+
+def restore_snapshot(game, data):
+    check_snapshot(data)
+    pos = HEADER.size
+    (level, health, x, y, direction, time_remaining, cooldown, door_open, boss_present,
+     power, time_scale, power_time_left, power_recharge, cols, rows) = STATE.unpack_from(data, pos)
+    pos += STATE.size
+    cells = cols * rows
+    types = data[pos:pos + cells]
+    pos += cells
+    # The flags are distinct bits, so OR-ing the byte strings as integers
+    # merges them cell by cell
+    merged = 0
+    size = (cells + 7) // 8
+    for flag in (REVEALED, ARTIFACT, LORE):
+        merged |= int.from_bytes(unpack_bits(data[pos:pos + size], cells, flag), "little")
+        pos += size
+    flags = merged.to_bytes(cells, "little")
+    inventory = []
+    for _ in range(2):
+        (count,) = COUNT.unpack_from(data, pos)
+        pos += COUNT.size
+        levels = array("H")
+        levels.frombytes(data[pos:pos + 2 * count])
+        inventory.append(levels)
+        pos += 2 * count
+    (enemy_count,) = COUNT.unpack_from(data, pos)
+    pos += COUNT.size
+    columns = []
+    for _ in range(5):
+        column = array("d")
+        column.frombytes(data[pos:pos + 8 * enemy_count])
+        columns.append(column)
+        pos += 8 * enemy_count
+    words = array("I")
+    words.frombytes(data[pos:pos + 625 * 4])
+    pos += 625 * 4
+    has_gauss, gauss = RNG_TAIL.unpack_from(data, pos)
+    pos += RNG_TAIL.size
+    has_seed, seed = PREFETCH.unpack_from(data, pos)
+    pos += PREFETCH.size
+    boss_health, clock, next_volley, volleys, projectile_count = BOSS.unpack_from(data, pos)
+    pos += BOSS.size
+    projectile_columns = []
+    for _ in range(4):
+        projectile_columns.append(data[pos:pos + 8 * projectile_count])
+        pos += 8 * projectile_count
+
+    game.current_level = level
+    game.current_theme = level_theme(level)
+    game.tile_images = load_tile_images(NUM_TILE_IMAGES, TILE_SIZE, game.current_theme)
+    game.tiles = TileGrid(cols, rows, types, game.tile_images, flags=flags)
+    game.tile_layer = TileLayer(game.tiles)
+    game.set_level_width()
+    game.load_player()
+    game.player.health = health
+    game.player.rect.topleft = (x, y)
+    game.player.current_image = game.player.images[DIRECTIONS[direction]]
+    game.camera.follow(game.player.rect)
+    game.time_remaining = time_remaining
+    game.enemy_collision_cooldown = cooldown
+    game.door_open = bool(door_open)
+    game.boss_present = bool(boss_present)
+    if game.boss_present:
+        boss = game.boss
+        boss.reset(level, game.level_width)
+        boss.health = boss_health
+        boss.clock = clock
+        boss.next_volley = next_volley
+        boss.volleys = volleys
+        boss.place()
+        projectiles = boss.projectiles
+        for column, values in zip((projectiles.xs, projectiles.ys, projectiles.vx, projectiles.vy),
+                                  projectile_columns):
+            column[:projectile_count] = array("d", values)
+        projectiles.count = projectile_count
+    game.time_power = TIME_POWERS[power] if power != NO_POWER else None
+    game.time_scale = time_scale
+    game.power_time_left = power_time_left
+    game.power_recharge = power_recharge
+    game.artifacts = [f"Artifact from Level {n}" for n in inventory[0]]
+    game.lore_items = [f"Lore from Level {n}" for n in inventory[1]]
+    game.paused = False
+
+    enemies = game.enemies
+    enemies.xs, enemies.ys, enemies.widths, enemies.heights, enemies.vx = columns
+    game.renderer.invalidate()
+
+    random.setstate((3, tuple(words), gauss if has_gauss else None))
+    if has_seed and game.prefetcher.pending_seed != seed:
+        game.prefetcher.prefetch(level + 1, seed, level_theme(level + 1), game.num_enemies)
+
+def write_snapshot(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+def read_snapshot(path):
+    with open(path, "rb") as f:
+        return f.read()
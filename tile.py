@@ -1,17 +1,52 @@
 import pygame
 
+# Bits of a cell in TileGrid.flags
+REVEALED = 1
+ARTIFACT = 2
+LORE = 4
+
 class Tile:
-    def __init__(self, x, y, width, height, image):
-        self.rect = pygame.Rect(x, y, width, height)
-        self.revealed = False
-        self.has_artifact = False
-        self.has_lore = False
-        self.image = image
+    # A view of one cell of a TileGrid. The state lives in the grid's arrays,
+    # so views are cheap to create and never need to be stored.
+    __slots__ = ("grid", "index")
+
+    def __init__(self, grid, index):
+        self.grid = grid
+        self.index = index
+
+    @property
+    def rect(self):
+        return self.grid.rect_of(self.index)
+
+    @property
+    def image(self):
+        return self.grid.images[self.grid.types[self.index]]
+
+    @property
+    def revealed(self):
+        return bool(self.grid.flags[self.index] & REVEALED)
+
+    @property
+    def has_artifact(self):
+        return bool(self.grid.flags[self.index] & ARTIFACT)
+
+    @has_artifact.setter
+    def has_artifact(self, value):
+        self.grid.set_flag(self.index, ARTIFACT, value)
+
+    @property
+    def has_lore(self):
+        return bool(self.grid.flags[self.index] & LORE)
+
+    @has_lore.setter
+    def has_lore(self, value):
+        self.grid.set_flag(self.index, LORE, value)
 
     def reveal(self):
-        self.revealed = True
+        self.grid.set_flag(self.index, REVEALED, True)
 
-    def draw(self, screen):
+    def draw(self, screen, offset_x=0):
+        rect = self.rect.move(-offset_x, 0)
         if self.revealed:
             if self.has_artifact:
                 color = (255, 215, 0)  # Gold color for artifact
@@ -19,6 +54,6 @@ class Tile:
                 color = (0, 191, 255)  # Deep sky blue for lore
             else:
                 color = (100, 100, 100)  # Gray for revealed tile
-            pygame.draw.rect(screen, color, self.rect)
+            pygame.draw.rect(screen, color, rect)
         else:
-            screen.blit(self.image, self.rect.topleft)
\ No newline at end of file
+            screen.blit(self.image, rect.topleft)
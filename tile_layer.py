@@ -0,0 +1,56 @@
+# tile_layer.py
+import pygame
+from constants import *
+
+class TileLayer:
+    # The tile field pre-rendered into screen-wide chunk surfaces. Chunks are
+    # built when the camera reaches them and dropped once it has moved on.
+    # Tiles that change are patched in place, so drawing the board is one or
+    # two blits no matter how long the level is.
+    def __init__(self, tiles, chunk_width=WIDTH):
+        self.tiles = tiles
+        self.chunk_cols = max(1, chunk_width // tiles.tile_size)
+        self.chunk_width = self.chunk_cols * tiles.tile_size
+        self.height = tiles.rows * tiles.tile_size
+        self.num_chunks = (tiles.cols + self.chunk_cols - 1) // self.chunk_cols
+        self.chunks = {}
+
+    def chunk(self, i):
+        surface = self.chunks.get(i)
+        if surface is None:
+            surface = pygame.Surface((self.chunk_width, self.height))
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+            surface.fill((0, 0, 0))
+            rows = self.tiles.rows
+            first = i * self.chunk_cols * rows
+            last = min((i + 1) * self.chunk_cols * rows, len(self.tiles))
+            for index in range(first, last):
+                self.tiles[index].draw(surface, i * self.chunk_width)
+            self.chunks[i] = surface
+        return surface
+
+    def redraw_tile(self, tile):
+        i = tile.index // (self.chunk_cols * self.tiles.rows)
+        surface = self.chunks.get(i)
+        if surface is not None:
+            offset_x = i * self.chunk_width
+            surface.fill((0, 0, 0), tile.rect.move(-offset_x, 0))
+            tile.draw(surface, offset_x)
+
+    def draw(self, screen, camera_x=0, area=None):
+        # Blit the part of the level seen by a camera at world x camera_x.
+        # area limits the blit to a region of the screen.
+        if area is None:
+            area = pygame.Rect(0, 0, WIDTH, HEIGHT)
+        world = area.move(camera_x, 0)
+        first = max(world.left // self.chunk_width, 0)
+        last = min((world.right - 1) // self.chunk_width, self.num_chunks - 1)
+        for i in range(first, last + 1):
+            chunk_rect = pygame.Rect(i * self.chunk_width, 0, self.chunk_width, self.height)
+            part = world.clip(chunk_rect)
+            screen.blit(self.chunk(i), (part.x - camera_x, part.y), part.move(-chunk_rect.x, 0))
+        # Chunks the camera has moved well away from are dropped
+        if len(self.chunks) > last - first + 3:
+            for i in [i for i in self.chunks if i < first - 1 or i > last + 1]:
+                del self.chunks[i]
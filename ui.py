@@ -1,40 +1,67 @@
 # ui.py
 import pygame
+from collections import OrderedDict
 from constants import *
 
+class TextCache:
+    # Rendered text surfaces keyed by (font, text, color, antialias), with the
+    # least recently used entries evicted past max_entries
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def render(self, font, text, antialias, color):
+        key = (font, text, color, antialias)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            return surface
+        surface = font.render(text, antialias, color)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        self.entries[key] = surface
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surface
+
 class UI:
-    def __init__(self, font):
+    def __init__(self, font, text_cache=None):
         self.font = font
+        self.text_cache = text_cache if text_cache is not None else TextCache()
+        # Last text and surface of each HUD field, re-rendered only on change
+        self.fields = {}
+
+    def render_field(self, name, text):
+        field = self.fields.get(name)
+        if field is None or field[0] != text:
+            field = (text, self.text_cache.render(self.font, text, True, (255, 255, 255)))
+            self.fields[name] = field
+        return field[1]
 
-    def draw(self, screen, current_level, player_health, time_remaining, tiles_left, artifacts, lore_items, time_power):
+    def draw(self, screen, current_level, player_health, time_remaining, tiles_left, artifacts, lore_items, time_power, power_status=None):
         # Draw the UI background
         pygame.draw.rect(screen, (50, 50, 50), (0, HEIGHT, WIDTH, UI_HEIGHT))
 
         # Display current level
-        level_text = self.font.render(f"Level: {current_level}", True, (255, 255, 255))
-        screen.blit(level_text, (10, HEIGHT + 10))
+        screen.blit(self.render_field("level", f"Level: {current_level}"), (10, HEIGHT + 10))
 
         # Display player health
-        health_text = self.font.render(f"Health: {player_health}", True, (255, 255, 255))
-        screen.blit(health_text, (10, HEIGHT + 50))
+        screen.blit(self.render_field("health", f"Health: {player_health}"), (10, HEIGHT + 50))
 
         # Display time remaining
-        time_text = self.font.render(f"Time: {int(time_remaining)}", True, (255, 255, 255))
-        screen.blit(time_text, (200, HEIGHT + 10))
+        screen.blit(self.render_field("time", f"Time: {int(time_remaining)}"), (200, HEIGHT + 10))
 
         # Display tiles left to click on
-        tiles_text = self.font.render(f"Tiles Left: {tiles_left}", True, (255, 255, 255))
-        screen.blit(tiles_text, (200, HEIGHT + 50))
+        screen.blit(self.render_field("tiles", f"Tiles Left: {tiles_left}"), (200, HEIGHT + 50))
 
         # Display artifacts found
-        artifacts_text = self.font.render(f"Artifacts: {len(artifacts)}", True, (255, 255, 255))
-        screen.blit(artifacts_text, (400, HEIGHT + 10))
+        screen.blit(self.render_field("artifacts", f"Artifacts: {len(artifacts)}"), (400, HEIGHT + 10))
 
         # Display lore items found
-        lore_text = self.font.render(f"Lore Items: {len(lore_items)}", True, (255, 255, 255))
-        screen.blit(lore_text, (400, HEIGHT + 50))
+        screen.blit(self.render_field("lore", f"Lore Items: {len(lore_items)}"), (400, HEIGHT + 50))
 
         # Display time power
         if time_power:
-            power_text = self.font.render(f"Power: {time_power}", True, (255, 255, 255))
-            screen.blit(power_text, (600, HEIGHT + 10))
\ No newline at end of file
+            screen.blit(self.render_field("power", f"Power: {time_power}"), (600, HEIGHT + 10))
+        if power_status:
+            screen.blit(self.render_field("power_status", power_status), (600, HEIGHT + 50))
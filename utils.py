@@ -1,9 +1,24 @@
 import pygame
+from constants import THEMES
+from assets import asset_manager
 
-def load_tile_images(num_images, tile_size):
-    tile_images = []
-    for i in range(num_images):
-        image = pygame.image.load(f'/home/mcuser/game-test/level_resources/tile_image{i}.png')
-        image = pygame.transform.scale(image, (tile_size, tile_size))
-        tile_images.append(image)
-    return tile_images
+def load_tile_images(num_images, tile_size, theme=None):
+    return asset_manager.tile_images(theme, num_images, tile_size)
+
+def level_theme(level_number):
+    return THEMES[(level_number - 1) % len(THEMES)]
+
+def cover_scale(image, size):
+    # Scale image to fill size without stretching it, cropping the overflow
+    # evenly from both sides, in the display's format when there is one
+    width, height = size
+    scale = max(width / image.get_width(), height / image.get_height())
+    scaled_size = (max(width, round(image.get_width() * scale)), max(height, round(image.get_height() * scale)))
+    # smoothscale only handles 24 and 32 bit images
+    scale_image = pygame.transform.smoothscale if image.get_bitsize() >= 24 else pygame.transform.scale
+    scaled = scale_image(image, scaled_size)
+    area = pygame.Rect((scaled_size[0] - width) // 2, (scaled_size[1] - height) // 2, width, height)
+    surface = scaled.subsurface(area).copy()
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert()
+    return surface